@@ -3,370 +3,301 @@
 # ---------------------------------------------------------------
 # Voraussetzung: pip install pandas plotly
 
+import argparse
+import contextlib
+import glob
+import io
+import json
+import multiprocessing
+import os
+
 import pandas as pd
-import re
-from datetime import datetime
-import plotly.graph_objects as go
 import time
 
-# ---------------------------------------------------------------
-# 1. CSV laden
-# ---------------------------------------------------------------
-file_path = "Ofenauswertung.csv"
-
-# Automatisch Encoding und Trennzeichen erkennen
-encodings = ["utf-8-sig", "cp1252", "latin1"]
-seps = [";", ",", "\t"]
-df = None
-for enc in encodings:
-    for sep in seps:
-        try:
-            tmp = pd.read_csv(file_path, sep=sep, encoding=enc)
-            # Prüfen, ob genügend Spalten vorhanden sind (mind. 5: Zeit, Gerät, Meldung, Soll, Ist)
-            if tmp.shape[1] >= 5: 
-                df = tmp
-                break
-        except Exception:
-            continue
-    if df is not None:
-        break
-
-if df is None:
-    raise Exception("❌ CSV konnte nicht eingelesen werden – prüfe Trennzeichen oder Encoding.")
-
-# ---------------------------------------------------------------
-# 2. Relevante Spalten finden und bereinigen
-# ---------------------------------------------------------------
-def find_col(keys):
-    for c in df.columns:
-        if any(k.lower() in c.lower() for k in keys):
-            return c
-    return None
-
-col_time = find_col(["Datum", "Zeit"])
-col_dev = find_col(["Ger", "Gerät", "Ger„t"])
-col_msg = find_col(["Meld"])
-col_soll = find_col(["Soll"])
-col_ist = find_col(["Ist"])
-
-df = df.rename(columns={
-    col_time: "Datum/Zeit",
-    col_dev: "Gerät",
-    col_msg: "Meldung",
-    col_soll: "Soll °C",
-    col_ist: "Ist °C"
-})
-
-# Zeitparsing
-def parse_timestamp(s):
-    s = str(s)
+from ofen_loader import clean_frame, read_csv_sniffed
+from ofen_cache import load_tables
+from ofen_cycle import CYCLE_START_HOUR, cycle_label, cycle_views, folded_view
+from ofen_downsample import DEFAULT_MAX_POINTS
+from ofen_phases import extract_phases
+from ofen_render import COMPRESSIONS, iter_dashboard, render_index, write_dashboard
+from ofen_stream import STREAM_CHUNK_ROWS, stream_tables
+from ofen_watch import watch_folder
+
+parser = argparse.ArgumentParser(description="Ofen-Dashboard aus einer MIWE-CSV erzeugen")
+parser.add_argument("file_path", nargs="?", default="Ofenauswertung.csv",
+                    help="MIWE-Export (Standard: Ofenauswertung.csv)")
+parser.add_argument("--multi-day", action="store_true",
+                    help="ein Dashboard pro 22:00-22:00-Zyklus statt alle Tage auf einen Zyklus zu legen")
+layout = parser.add_mutually_exclusive_group()
+layout.add_argument("--shared-axes", action="store_true",
+                    help="alle Öfen in einer Figur mit gemeinsamer Zeitachse (verknüpfter Zoom/Pan)")
+layout.add_argument("--client", action="store_true",
+                    help="Daten als ein JSON-Dokument, die Diagramme baut der Browser erst beim Scrollen "
+                         "(kleinere Datei, für viele Öfen)")
+parser.add_argument("--webgl", action=argparse.BooleanOptionalAction, default=None,
+                    help="Temperaturkurven als WebGL (Scattergl) erzwingen/abschalten; "
+                         "ohne Angabe automatisch bei vielen Messpunkten")
+parser.add_argument("--max-points", type=int, default=DEFAULT_MAX_POINTS,
+                    help="Punktebudget pro Temperaturkurve: max_points/4 Zeitabschnitte, je bis zu 4 Punkte "
+                         "(bei Messlücken bis zu 6, also höchstens 1,5-fach), 0 = alle Rohdaten "
+                         f"(Standard: {DEFAULT_MAX_POINTS})")
+parser.add_argument("--offline", action="store_true",
+                    help="plotly.js einmal in die HTML-Datei einbetten (funktioniert ohne Internet)")
+parser.add_argument("--compress", action="append", choices=["gzip", "br"], default=[],
+                    help="zusätzlich komprimierte Variante schreiben (.gz / .br, mehrfach möglich)")
+parser.add_argument("--jobs", type=int, default=1, metavar="N",
+                    help="Einzeldiagramme mit N Prozessen parallel erzeugen (Standard: 1)")
+reading = parser.add_mutually_exclusive_group()
+reading.add_argument("--incremental", action="store_true",
+                     help="für eine wachsende CSV: nur seit dem letzten Lauf angehängte Zeilen einlesen "
+                          "und nur Tagesdateien mit neuen Daten neu schreiben")
+reading.add_argument("--chunk-rows", type=int, metavar="N",
+                     help="CSV in Stücken zu N Zeilen lesen und Messwerte sofort ausdünnen "
+                          f"(für Exporte größer als der Arbeitsspeicher, z.B. {STREAM_CHUNK_ROWS}; ohne Cache)")
+mode = parser.add_mutually_exclusive_group()
+mode.add_argument("--watch", metavar="ORDNER",
+                  help="Ordner dauerhaft beobachten und bei jeder neuen oder geänderten CSV "
+                       "das Dashboard neu erzeugen (Strg+C beendet)")
+mode.add_argument("--batch", metavar="MUSTER",
+                  help="alle passenden CSVs verarbeiten, z.B. \"exporte/*.csv\" (mit --jobs N parallel): "
+                       "ein Dashboard pro Datei plus index.html mit Laufzeiten und Fehlern")
+parser.add_argument("--output-dir", default="dashboards", metavar="ORDNER",
+                    help="Zielordner für --batch (Standard: dashboards)")
+args = parser.parse_args()
+
+
+def load_and_clean_csv(source, state=None):
+    """
+    Abschnitte 1-4: CSV (Pfad oder Bytes) -> (df, preheats, runs, registry).
+    state: Phasen-Zustand am Ende des bereits gelesenen Teils (Anhänge-Modus).
+    """
+    # ---------------------------------------------------------------
+    # 1. CSV laden
+    # ---------------------------------------------------------------
+    # Encoding und Trennzeichen anhand der ersten KB erkennen, dann genau ein Parse
+    df, dialect = read_csv_sniffed(source)
+    print(f"🔎 CSV erkannt: {dialect.describe()}")
+
+    # ---------------------------------------------------------------
+    # 2./3. Spalten zuordnen und bereinigen, Gerät + Herd + Meldungen zerlegen
+    # ---------------------------------------------------------------
+    df, registry = clean_frame(df)
+
+    # ---------------------------------------------------------------
+    # 4. Programmphasen bestimmen + Programmnummern extrahieren
+    # ---------------------------------------------------------------
+    # is_loaded / is_started / is_ended / prog_num stammen aus classify_messages (Abschnitt 3)
+
+    # Vorheizen (Laden -> Start) und Läufe (Start -> Ende, mit Programmnummer) als Intervalltabellen
+    preheats, runs = extract_phases(df, state)
+    return df, preheats, runs, registry
+
+
+def _record_path(output_path):
+    """Versteckte Begleitdatei eines Dashboards: .<name>.html.json im selben Ordner."""
+    folder, name = os.path.split(output_path)
+    return os.path.join(folder, f".{name}.json")
+
+
+def write_output_record(output_path, record):
+    """Merkt sich, aus welcher CSV (Inhalts-Hash) mit welchen Optionen output_path erzeugt wurde."""
+    path = _record_path(output_path)
     try:
-        parts = s.split(",")
-        if len(parts) >= 3:
-            # Versucht Format wie "23/10/25, 08:30:00, 000"
-            return datetime.strptime(f"{parts[0]} {parts[1]}.{parts[2]}", "%y/%m/%d %H:%M:%S.%f")
-    except:
-        pass
-    # Versucht Standard-Pandas-Konvertierung (Tag zuerst für europäische Formate)
-    return pd.to_datetime(s, dayfirst=True, errors="coerce")
-
-df["timestamp"] = df["Datum/Zeit"].apply(parse_timestamp)
-df = df.dropna(subset=["timestamp"]).sort_values("timestamp")
-
-# ---------------------------------------------------------------
-# 3. Gerät + Herd extrahieren
-# ---------------------------------------------------------------
-def parse_device(dev):
-    m = re.match(r"^(.*?)\s*\((.*?)\)\s*$", str(dev))
-    if m:
-        return m.group(1).strip(), m.group(2).strip()
-    return str(dev), ""
-
-df[["device_type", "device_id"]] = df["Gerät"].apply(lambda x: pd.Series(parse_device(x)))
-
-# Bereinigung: Geräte ohne Namen aber mit ID automatisch als MIWE gateway setzen
-def clean_device_type(row):
-    device_type = str(row.device_type).strip()
-    device_id = str(row.device_id).strip()
-
-    # Wenn kein Name aber ID im Format "X/Y" vorhanden ist -> MIWE gateway
-    if (not device_type or device_type == "0" or device_type == "nan") and device_id and "/" in device_id:
-        return "MIWE gateway"
-    return device_type
-
-df["device_type"] = df.apply(clean_device_type, axis=1)
+        with open(path + ".tmp", "w") as f:
+            json.dump(record, f)
+        os.replace(path + ".tmp", path)
+    except OSError as e:
+        print(f"⚠️ Begleitdatei nicht geschrieben ({path}): {e}")
+
+
+def _output_current(output_path, record, base):
+    """
+    Ob output_path (samt komprimierten Varianten) existiert und aus derselben CSV mit denselben
+    Optionen erzeugt wurde – auf dem Stand base, an den dieser Lauf angeschlossen hat.
+    """
+    if base is None:
+        return False
+    paths = [output_path] + [output_path + COMPRESSIONS[method] for method in record["compress"]]
+    if not all(os.path.exists(p) for p in paths):
+        return False
+    try:
+        with open(_record_path(output_path)) as f:
+            stored = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return stored.get("digest") in (base, record["digest"]) and \
+        {k: v for k, v in stored.items() if k != "digest"} == {k: v for k, v in record.items() if k != "digest"}
+
+
+def build_dashboards(file_path, output_dir="", name="ofen_dashboard", title="Ofen-Dashboard", jobs=None):
+    """
+    Abschnitte 4.5-6 für eine CSV: Zyklen bestimmen, Diagramme zeichnen, Dashboard(s) als
+    output_dir/name[_JJJJ-MM-TT].html schreiben. Gibt die Pfade der HTML-Dateien zurück.
+    jobs: Prozesse für die Einzeldiagramme (None = --jobs).
+    """
+    if args.chunk_rows:
+        # Sehr große Exporte: Stück für Stück, es liegt nie die ganze Datei im Speicher
+        tables, report = stream_tables(file_path, args.chunk_rows, args.max_points)
+        print(f"🔎 CSV erkannt: {report.dialect.describe()}")
+        print(f"🧩 {report.rows_read} Zeilen in {report.chunks} Stücken gelesen, {report.rows_kept} für die Diagramme behalten")
+        if report.unordered:
+            print("⚠️ Zeitstempel nicht fortlaufend – Phasen an Stückgrenzen können von einem vollständigen Einlesen abweichen")
+        digest = base = unchanged_before = None
+    else:
+        tables, digest, base, unchanged_before = load_tables(file_path, load_and_clean_csv, args.incremental)
+    df, preheats, runs, registry = tables
 
-def extract_herd(msg):
-    m = re.search(r"Herd\s*([0-9]+)", str(msg))
-    return f"Herd {m.group(1)}" if m else None
+    # ---------------------------------------------------------------
+    # 4.5. 24h-Zyklus-Basiszeitpunkt bestimmen (KORRIGIERT FÜR 22:00-22:00 ZYKLUS)
+    # ---------------------------------------------------------------
 
-df["herd"] = df["Meldung"].apply(extract_herd)
+    # Finde den frühesten Timestamp im gesamten DataFrame
+    if df.empty:
+        raise Exception("❌ DataFrame ist leer – es wurden keine gültigen Zeitstempel gefunden.")
 
-def make_row_name(row):
-    if "miwe ideal tc" in str(row.device_type).lower():
-        return f"{row.device_type} ({row.device_id}) - {row.herd or 'kein Herd'}"
-    return f"{row.device_type} ({row.device_id})"
+    if args.multi_day:
+        # Ein Zyklus pro Produktionstag; Läufe über 22:00 werden an der Grenze geteilt
+        views = list(cycle_views(df, preheats, runs, CYCLE_START_HOUR))
+        print(f"🔗 Mehrtages-Modus: {len(views)} Zyklen von {views[0].start.strftime('%d.%m. %H:%M')} bis {views[-1].end.strftime('%d.%m. %H:%M')}")
+    else:
+        # Alle Daten auf den Zyklus des frühesten Zeitstempels legen
+        views = [folded_view(df, preheats, runs, CYCLE_START_HOUR)]
+        print(f"🔗 Analysierter 24h-Zeitraum: {views[0].label}")
+
+    # ---------------------------------------------------------------
+    # 5./6. Diagramme pro Ofen/Herd erstellen und Dashboard schreiben
+    # ---------------------------------------------------------------
+    # Reihenfolge (smart_sort_key) kommt aus dem Geräte-Register
+    all_names = list(registry.row_names)
+
+    render_options = dict(shared_axes=args.shared_axes, client=args.client, webgl=args.webgl,
+                          max_points=args.max_points, offline=args.offline,
+                          jobs=args.jobs if jobs is None else jobs)
+
+    outputs = []
+    for view in views:
+        if view.cycle_id is None:
+            output_path = os.path.join(output_dir, f"{name}.html")
+            view_title = title
+        else:
+            # Benannt nach dem Produktionstag (Endtag des 22:00-22:00-Zyklus)
+            output_path = os.path.join(output_dir, f"{name}_{view.end.strftime('%Y-%m-%d')}.html")
+            view_title = f"{title} – {cycle_label(view.cycle_id, CYCLE_START_HOUR)}"
+        html_content = iter_dashboard(view, all_names, title=view_title, **render_options)
+        outputs.append(output_path)
+
+        # Woraus die Datei erzeugt wurde: Quelle, Datenstand und alle Optionen, die das HTML bestimmen
+        record = dict(source=os.path.abspath(file_path), digest=digest, title=view_title,
+                      layout="shared" if args.shared_axes else "client" if args.client else "single",
+                      webgl=args.webgl, max_points=args.max_points, offline=args.offline,
+                      compress=sorted(set(args.compress)))
+
+        # Anhänge-Modus: Dashboards ohne neue Daten nicht neu zeichnen (gefaltet: nur wenn gar nichts neu ist),
+        # aber nur, wenn die vorhandene Datei aus derselben CSV mit denselben Optionen stammt
+        shown_until = view.end if view.cycle_id is not None else pd.Timestamp.max
+        if unchanged_before is not None and shown_until <= unchanged_before and \
+                _output_current(output_path, record, base):
+            write_output_record(output_path, record)
+            print(f"⏭️ Unverändert: {output_path}")
+            continue
 
-df["row_name"] = df.apply(make_row_name, axis=1)
+        # Kopf, Diagramme und Fuß werden direkt in die Datei(en) geschrieben
+        for path in write_dashboard(output_path, html_content, args.compress):
+            print(f"✅ Dashboard erstellt: {path}")
+        write_output_record(output_path, record)
+    return outputs
 
-# ---------------------------------------------------------------
-# 4. Programmphasen bestimmen + Programmnummern extrahieren
-# ---------------------------------------------------------------
-df["is_loaded"] = df["Meldung"].str.contains("Arbeitsprog", case=False, na=False)
-df["is_started"] = df["Meldung"].str.contains("Programm gestartet", case=False, na=False)
-df["is_ended"] = df["Meldung"].str.contains("Programmende|Programm beendet|Programm gestoppt", case=False, na=False)
-
-# Funktion: Programmnummer aus Meldung extrahieren (z.B. "P1", "Programm 123" -> "P123")
-def extract_program_number(msg):
-    msg_str = str(msg)
-    # Suche nach "P" gefolgt von Ziffern
-    m = re.search(r"P\s*(\d+)", msg_str, re.IGNORECASE)
-    if m:
-        return f"P{m.group(1)}"
-    # Alternativ: "Programm 123" oder "Prog 123"
-    m = re.search(r"(?:Programm|Prog)\s+(\d+)", msg_str, re.IGNORECASE)
-    if m:
-        return f"P{m.group(1)}"
-    return None
-
-df["prog_num"] = df["Meldung"].apply(extract_program_number)
-
-preheats = []
-runs = []  # jetzt: (name, start, end, prog_num)
-for name, g in df.groupby("row_name"):
-    g = g.sort_values("timestamp")
-    t_load = t_start = prog_num = None
-    for _, r in g.iterrows():
-        t = r["timestamp"]
-        # Programmnummer merken, wenn vorhanden
-        if r["prog_num"]:
-            prog_num = r["prog_num"]
-
-        if r["is_loaded"]:
-            t_load = t
-        if r["is_started"]:
-            if t_load:
-                preheats.append((name, t_load, t))
-                t_load = None
-            t_start = t
-        if r["is_ended"] and t_start:
-            runs.append((name, t_start, t, prog_num))
-            t_start = None
-            prog_num = None  # Reset für nächsten Run
 
 # ---------------------------------------------------------------
-# 4.5. 24h-Zyklus-Basiszeitpunkt bestimmen (KORRIGIERT FÜR 22:00-22:00 ZYKLUS)
+# Stapelbetrieb: viele CSVs parallel, Übersicht als index.html
 # ---------------------------------------------------------------
-
-# Finde den frühesten Timestamp im gesamten DataFrame
-if df.empty:
-    raise Exception("❌ DataFrame ist leer – es wurden keine gültigen Zeitstempel gefunden.")
-
-earliest_timestamp = df["timestamp"].min()
-
-# 1. Den Tagesanfang (00:00) des Datums finden
-start_time_base = earliest_timestamp.replace(hour=22, minute=0, second=0, microsecond=0)
-
-if earliest_timestamp.hour < 22:
-    # Wenn der früheste Eintrag VOR 22:00 liegt (z.B. 10:00 am 25.10.),
-    # dann war 22:00 Uhr am VOR-Tag der Start des Zyklus.
-    cycle_start = start_time_base - pd.Timedelta(days=1)
+def batch_names(pattern, files):
+    """
+    Ausgabename pro Datei: Pfad relativ zum festen Anfang des Musters, Trenner durch "_" ersetzt
+    (siteA/2025-10-22.csv -> siteA_2025-10-22). Vergebene Namen bekommen _2, _3, … angehängt.
+    """
+    parts = os.path.normpath(pattern).split(os.sep)
+    fixed = []
+    for part in parts[:-1]:
+        if any(c in part for c in "*?["):
+            break
+        fixed.append(part)
+    root = os.sep.join(fixed) or os.curdir
+    names, used = [], set()
+    for file_path in files:
+        base = os.path.splitext(os.path.relpath(file_path, root))[0].replace(os.sep, "_").lstrip("._") or "export"
+        # Zähler erhöhen, bis der Name frei ist: x/y, x_y und x_y_2 ergäben sonst zweimal x_y_2
+        name, n = base, 1
+        while name in used:
+            n += 1
+            name = f"{base}_{n}"
+        used.add(name)
+        names.append(name)
+    return names
+
+
+def batch_task(task):
+    """Worker: eine CSV (file_path, Ausgabename) verarbeiten; ein Fehler wird gemeldet statt den Stapel abzubrechen."""
+    file_path, name = task
+    started = time.perf_counter()
+    try:
+        # Parallel wird hier über die Dateien gearbeitet, nicht zusätzlich über die Geräte;
+        # die Einzelmeldungen der Datei entfallen, gemeldet wird eine Zeile pro Datei
+        with contextlib.redirect_stdout(io.StringIO()):
+            outputs = build_dashboards(file_path, args.output_dir, name, f"Ofen-Dashboard – {name}", jobs=1)
+        error = None
+    except Exception as e:
+        outputs, error = [], str(e).removeprefix("❌ ") or type(e).__name__
+    return dict(file=file_path, size=os.path.getsize(file_path), seconds=time.perf_counter() - started,
+                outputs=outputs, error=error)
+
+
+def _batch_pool(jobs):
+    """
+    Prozess-Pool per fork (siehe ofen_render._process_pool), sonst None = nacheinander.
+    maxtasksperchild=1: jede Datei in einem frischen Prozess, ihr Speicher wird danach ganz
+    freigegeben – pro Worker liegt immer nur ein Export im Speicher.
+    """
+    if jobs <= 1 or "fork" not in multiprocessing.get_all_start_methods():
+        return None
+    return multiprocessing.get_context("fork").Pool(jobs, maxtasksperchild=1)
+
+
+def run_batch(pattern):
+    files = sorted(glob.glob(pattern, recursive=True))
+    if not files:
+        parser.error(f"keine Dateien passen zu {pattern!r}")
+    os.makedirs(args.output_dir, exist_ok=True)
+    print(f"📦 Stapel: {len(files)} Dateien, {max(args.jobs, 1)} Prozess(e) -> {args.output_dir}")
+
+    started = time.perf_counter()
+    pool = _batch_pool(args.jobs)
+    results = []
+    try:
+        # Ergebnisse in Fertigstellungs-Reihenfolge melden, die Übersicht ist nach Dateiname sortiert
+        tasks = list(zip(files, batch_names(pattern, files)))
+        for result in (pool.imap_unordered(batch_task, tasks) if pool is not None else map(batch_task, tasks)):
+            results.append(result)
+            if result["error"] is None:
+                print(f"✅ [{len(results)}/{len(files)}] {result['file']}: {len(result['outputs'])} Dashboard(s) in {result['seconds']:.1f} s")
+            else:
+                print(f"❌ [{len(results)}/{len(files)}] {result['file']}: {result['error']}")
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    results.sort(key=lambda r: r["file"])
+    index_path = os.path.join(args.output_dir, "index.html")
+    write_dashboard(index_path, render_index(results, args.output_dir))
+    failed = sum(r["error"] is not None for r in results)
+    print(f"📋 Übersicht: {index_path} ({len(results) - failed} ok, {failed} fehlgeschlagen, {time.perf_counter() - started:.1f} s)")
+
+
+if args.batch:
+    run_batch(args.batch)
+elif args.watch:
+    # Dauerbetrieb: bei jeder neuen/geänderten CSV im Ordner das Dashboard neu erzeugen
+    watch_folder(args.watch, build_dashboards)
 else:
-    # Wenn der früheste Eintrag NACH 22:00 liegt (z.B. 23:00 am 25.10.),
-    # dann ist dieser 22:00-Uhr-Zeitpunkt der Start des Zyklus.
-    cycle_start = start_time_base
-
-# Das Ende ist 24 Stunden nach dem Start
-cycle_end = cycle_start + pd.Timedelta(hours=24)
-
-print(f"🔗 Analysierter 24h-Zeitraum: {cycle_start.strftime('%d.%m. %H:%M')} bis {cycle_end.strftime('%d.%m. %H:%M')}")
-
-
-# ---------------------------------------------------------------
-# 5. Diagramme pro Ofen/Herd erstellen (FINAL KORRIGIERT: DATUMS-RESET)
-# ---------------------------------------------------------------
-# Bessere Sortierung: Nach Gerätetyp und ID, dann Herd
-def smart_sort_key(row_name):
-    """Sortiert Geräte logisch: zuerst nach Typ, dann nach ID-Nummer, dann nach Herd"""
-    # ... (Smart Sort Key Funktion bleibt unverändert)
-    parts = row_name.split(" - ")
-    base = parts[0]
-    herd = parts[1] if len(parts) > 1 else ""
-    match = re.match(r"^(.*?)\s*\(([^)]+)\)\s*$", base)
-    if match:
-        device_type = match.group(1).strip().lower()
-        device_id = match.group(2).strip()
-    else:
-        device_type = base.lower()
-        device_id = ""
-    if not device_type or device_type == "0" or device_type == "nan" or not device_id:
-        return ("zzz_invalid", [9999], 9999)
-    id_numbers = [int(x) if x.isdigit() else 0 for x in re.findall(r'\d+', device_id)]
-    if not id_numbers:
-        id_numbers = [9999]
-    herd_match = re.search(r"Herd\s*(\d+)", herd)
-    herd_num = int(herd_match.group(1)) if herd_match else 0
-    return (device_type, id_numbers, herd_num)
-
-html_parts = []
-all_names = sorted(df["row_name"].unique(), key=smart_sort_key)
-
-# Achsenbereich für alle Plots
-x_range_start = cycle_start
-x_range_end = cycle_end
-
-# Definiere festen Y-Achsen-Bereich
-Y_AXIS_MAX = 350
-Y_AXIS_MIN = 0
-DUMMY_TEMP = -10 
-
-# NEUE HILFSFUNKTION: Setzt den Zeitstempel in das 24h-Zyklus-Datum
-def adjust_timestamp_to_cycle(ts, cycle_start_date):
-    # Wenn die Uhrzeit >= 22:00 ist, gehört sie zum Startdatum des Zyklus
-    if ts.hour >= 22:
-        return ts.replace(year=cycle_start_date.year, month=cycle_start_date.month, day=cycle_start_date.day)
-    # Wenn die Uhrzeit < 22:00 ist, gehört sie zum nächsten Kalendertag des Zyklus
-    else:
-        next_day = cycle_start_date + pd.Timedelta(days=1)
-        return ts.replace(year=next_day.year, month=next_day.month, day=next_day.day)
-
-# Hole nur das Datum des cycle_start, da die Uhrzeit in der Funktion verwendet wird
-cycle_start_date_only = cycle_start.normalize()
-
-for name in all_names:
-    subset = df[df["row_name"] == name].copy() 
-    if subset.empty:
-        continue
-
-    # NEU: Zeitstempel-Anpassung
-    # Die tatsächlichen Zeitstempel der Daten werden auf das Datum des Zyklus gesetzt
-    subset["timestamp"] = subset["timestamp"].apply(
-        lambda ts: adjust_timestamp_to_cycle(ts, cycle_start_date_only)
-    )
-
-    # Werte für die Plots vorbereiten: Komma durch Punkt ersetzen und in Zahl konvertieren
-    subset["Ist °C"] = pd.to_numeric(subset["Ist °C"].astype(str).str.replace(",", "."), errors="coerce")
-    subset["Soll °C"] = pd.to_numeric(subset["Soll °C"].astype(str).str.replace(",", "."), errors="coerce")
-
-    # FIKTIVE DATENPUNKTE HINZUFÜGEN, UM ACHSE ZU ERZWINGEN (X und Y)
-    dummy_data = {
-        "timestamp": [x_range_start, x_range_end],
-        "Ist °C": [DUMMY_TEMP, DUMMY_TEMP], 
-        "Soll °C": [DUMMY_TEMP, DUMMY_TEMP],
-        "Gerät": [subset["Gerät"].iloc[0]] * 2 if not subset["Gerät"].empty else ["DUMMY"]*2,
-        "row_name": [name] * 2
-    }
-    dummy_df = pd.DataFrame(dummy_data)
-
-    # Dummy-Daten zum Subset hinzufügen und nach Zeit sortieren
-    subset = pd.concat([subset, dummy_df], ignore_index=True)
-    subset = subset.sort_values("timestamp").reset_index(drop=True)
-
-    # -------------------------------------------------------------
-    # Plotting beginnt hier (unverändert)
-    # -------------------------------------------------------------
-
-    fig = go.Figure()
-
-    # Temperaturkurven
-    if subset["Ist °C"].notna().any():
-        fig.add_trace(go.Scatter(
-            x=subset["timestamp"], y=subset["Ist °C"],
-            mode="lines", name="Ist °C", line=dict(color="orange", width=2)
-        ))
-
-    if subset["Soll °C"].notna().any():
-        fig.add_trace(go.Scatter(
-            x=subset["timestamp"], y=subset["Soll °C"],
-            mode="lines", name="Soll °C", line=dict(color="blue", dash="dot", width=1.5)
-        ))
-
-    # Vorheizen/Laufzeit-Balken + Programmnummer-Annotations (unverändert)
-    for n, s, e in preheats:
-        # Auch hier müssen die Zeiten der preheats und runs angepasst werden, 
-        # damit sie im korrigierten 24h-Zyklus landen.
-        s_adj = adjust_timestamp_to_cycle(s, cycle_start_date_only)
-        e_adj = adjust_timestamp_to_cycle(e, cycle_start_date_only)
-
-        if n == name:
-            fig.add_shape(type="rect", x0=s_adj, x1=e_adj, y0=0, y1=1,
-                          xref="x", yref="paper", fillcolor="rgba(255,0,0,0.3)", line=dict(width=0))
-
-    for item in runs:
-        n = item[0]
-        s = item[1]
-        e = item[2]
-        prog_num = item[3] if len(item) > 3 else None
-
-        # Anpassung der Laufzeiten
-        s_adj = adjust_timestamp_to_cycle(s, cycle_start_date_only)
-        e_adj = adjust_timestamp_to_cycle(e, cycle_start_date_only)
-
-        if n == name:
-            # Grünes Rechteck für Programm-Run
-            fig.add_shape(type="rect", x0=s_adj, x1=e_adj, y0=0, y1=1,
-                          xref="x", yref="paper", fillcolor="rgba(0,200,0,0.3)", line=dict(width=0))
-
-            # Programmnummer als Text-Annotation in der Mitte des Rechtecks
-            if prog_num:
-                mid_time = s_adj + (e_adj - s_adj) / 2
-                fig.add_annotation(
-                    x=mid_time,
-                    y=0.95,
-                    yref="paper",
-                    text=f"<b>{prog_num}</b>",
-                    showarrow=False,
-                    font=dict(size=14, color="darkgreen"),
-                    bgcolor="rgba(255,255,255,0.7)",
-                    bordercolor="darkgreen",
-                    borderwidth=1,
-                    borderpad=3
-                )
-
-    fig.update_layout(
-        title=f"{name}",
-        xaxis_title="Zeit",
-        yaxis_title="Temperatur °C",
-        height=350,
-        margin=dict(l=80, r=30, t=50, b=40),
-        template="plotly_white",
-        legend=dict(orientation="h", y=-0.25),
-        # X-Achse: Skalierung erzwungen durch Dummy-Daten
-        xaxis=dict(
-            type='date',
-            tickformat="%H:%M", 
-            ticklabelmode="period",
-            dtick=3600000 * 2 # Ticks alle 2 Stunden
-        ),
-        # Fester Y-Achsen-Bereich
-        yaxis=dict(
-            range=[Y_AXIS_MIN, Y_AXIS_MAX], 
-            dtick=50 # Ticks alle 50 Grad
-        )
-    )
-
-    # Hier wird jetzt das vollständige Plotly-JS eingebettet
-    html_parts.append(fig.to_html(full_html=False, include_plotlyjs='cdn'))
-
-# ---------------------------------------------------------------
-# 6. Gesamtes Dashboard schreiben (unverändert)
-# ---------------------------------------------------------------
-html_content = """
-<html>
-<head>
-    <meta charset="utf-8">
-    <title>Ofen-Dashboard</title>
-</head>
-<body style="font-family:Arial; margin:20px;">
-    <h1>Ofen-Dashboard</h1>
-    <p>Vorheizen = Rot | Laufzeit = Grün | Ist/Soll-Temperatur = Linien</p>
-    {}
-</body>
-</html>
-""".format("\n<hr style='margin:40px 0;'>\n".join(html_parts))
-
-output_path = "ofen_dashboard.html"
-with open(output_path, "w", encoding="utf-8") as f:
-    f.write(html_content)
-
-print(f"✅ Dashboard erstellt: {output_path}")
\ No newline at end of file
+    build_dashboards(args.file_path)
@@ -0,0 +1,329 @@
+# ofen_cache.py
+# Parquet-Cache der bereinigten Daten: gleiche CSV -> kein erneutes Parsen
+# ---------------------------------------------------------------
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from ofen_loader import DeviceRegistry, concat_frames, sniff_csv_dialect
+from ofen_phases import IntervalStore, phase_state
+
+# Erhöhen, sobald sich Bereinigung oder Phasenlogik ändern (alte Caches werden dann ignoriert)
+CACHE_VERSION = 2
+
+# Streamlit-Uploads haben keinen Dateipfad: Cache im Arbeitsverzeichnis
+UPLOAD_CACHE_DIR = ".ofen_cache"
+
+CACHE_TABLES = ["frame", "preheats", "runs", "devices"]
+# Offener Zustand der Phasen-Zustandsmaschine + Anzahl gelesener Bytes (für den Anhänge-Modus)
+STATE_TABLE = "state"
+META_FILE = "meta.json"
+
+
+def parquet_available():
+    """Parquet braucht pyarrow (optional, z.B. über streamlit installiert)."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def sidecar_dir(file_path):
+    """Cache-Verzeichnis neben der CSV, z.B. Ofenauswertung.csv.cache/"""
+    return f"{file_path}.cache"
+
+
+def upload_cache_dir(file_name):
+    """
+    Cache-Verzeichnis eines Streamlit-Uploads: ein Unterordner pro Dateiname, damit sich
+    verschiedene Uploads (und Sitzungen) nicht gegenseitig aus dem Cache verdrängen.
+    """
+    safe = re.sub(r"[^\w.-]", "_", os.path.basename(file_name)).lstrip(".") or "upload"
+    return os.path.join(UPLOAD_CACHE_DIR, safe)
+
+
+def source_digest(data):
+    """Inhalts-Hash der CSV-Bytes (blake2b) plus Cache-Version."""
+    digest = hashlib.blake2b(data, digest_size=16)
+    digest.update(f"v{CACHE_VERSION}".encode())
+    return digest.hexdigest()
+
+
+def file_digest(path):
+    """Wie source_digest, aber blockweise aus der Datei gelesen (die Bytes liegen nie ganz im Speicher)."""
+    with open(path, "rb") as f:
+        digest = hashlib.file_digest(f, lambda: hashlib.blake2b(digest_size=16))
+    digest.update(f"v{CACHE_VERSION}".encode())
+    return digest.hexdigest()
+
+
+def load_cached(cache_dir, digest):
+    """(df, preheats, runs, registry) aus dem Cache oder None, wenn nicht vorhanden/lesbar."""
+    path = os.path.join(cache_dir, digest)
+    if not parquet_available() or not os.path.isdir(path):
+        return None
+    try:
+        tables = {name: pd.read_parquet(os.path.join(path, f"{name}.parquet")) for name in CACHE_TABLES}
+    except (OSError, ValueError):
+        # Unvollständiger oder beschädigter Cache -> neu parsen
+        return None
+    return (tables["frame"], IntervalStore(tables["preheats"]), IntervalStore(tables["runs"]),
+            DeviceRegistry(tables["devices"]))
+
+
+def store_cached(cache_dir, digest, df, preheats, runs, registry, state=None, offset=None, length=None):
+    """
+    Schreibt die bereinigten Tabellen nach cache_dir/<digest>/ und entfernt Einträge
+    älterer Stände derselben Quelle. Ohne pyarrow passiert nichts.
+    state: Zustand nach der letzten Zeile (sonst aus df bestimmt), offset: Länge der
+    gelesenen Bytes, an die der Anhänge-Modus anschließen kann, length: Länge der ganzen
+    Quelle, falls die Tabellen eine letzte, noch nicht abgeschlossene Zeile nicht enthalten.
+    Ein nicht schreibbarer Cache (z.B. schreibgeschützte Freigabe) wird nur gemeldet: None.
+    """
+    if not parquet_available():
+        return None
+    path = os.path.join(cache_dir, digest)
+    tmp_path = None
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Eindeutiger Name: gleichzeitige Läufe/Sitzungen schreiben nie in dasselbe Verzeichnis
+        tmp_path = tempfile.mkdtemp(prefix=f"{digest}.", suffix=".tmp", dir=cache_dir)
+        tables = {"frame": df, "preheats": preheats.table, "runs": runs.table, "devices": registry.table,
+                  STATE_TABLE: phase_state(df) if state is None else state}
+        for name, table in tables.items():
+            table.to_parquet(os.path.join(tmp_path, f"{name}.parquet"), index=False)
+        with open(os.path.join(tmp_path, META_FILE), "w") as f:
+            json.dump({"offset": offset, "length": offset if length is None else length}, f)
+
+        # Erst vollständig schreiben, dann umbenennen: ein halber Cache wird nie gelesen
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp_path, path)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Cache nicht geschrieben ({cache_dir}): {e}")
+        if tmp_path is not None:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+        return None
+
+    # Ältere Stände entfernen; halb geschriebene (*.tmp) gehören gerade laufenden Schreibvorgängen
+    for entry in os.listdir(cache_dir):
+        if entry != digest and not entry.endswith(".tmp"):
+            shutil.rmtree(os.path.join(cache_dir, entry), ignore_errors=True)
+    return path
+
+
+# ---------------------------------------------------------------
+# Anhänge-Modus: nur die seit dem letzten Lauf angehängten Zeilen parsen
+# ---------------------------------------------------------------
+def complete_length(source):
+    """Länge bis einschließlich des letzten Zeilenumbruchs (ohne eine evtl. noch wachsende letzte Zeile)."""
+    return source.rfind(b"\n") + 1
+
+
+def complete_row(source, start):
+    """
+    Ob die letzte Zeile (ab start, ohne Zeilenumbruch) so viele Felder wie die Kopfzeile hat: dann
+    ist sie die fertige Schlusszeile eines Exports ohne abschließenden Umbruch, sonst halb geschrieben.
+    """
+    dialect = sniff_csv_dialect(source)
+    if dialect is None:
+        return False
+    sep = dialect.sep.encode()
+    return source.count(sep, start) >= source.count(sep, 0, source.index(b"\n"))
+
+
+def cached_extent(cache_dir, digest):
+    """
+    (offset, length) eines Cache-Eintrags: die Tabellen decken die ersten offset Bytes ab, der
+    Eintrag gehört zu einer Quelle mit length Bytes. None, wenn nicht lesbar.
+    """
+    try:
+        with open(os.path.join(cache_dir, digest, META_FILE)) as f:
+            meta = json.load(f)
+        offset = meta["offset"]
+    except (OSError, ValueError, KeyError):
+        return None
+    if not isinstance(offset, int):
+        return None
+    return offset, meta.get("length", offset)
+
+
+def cached_prefix(cache_dir, source):
+    """
+    Sucht einen Cache-Eintrag, dessen Quelle ein Anfangsstück von source ist (die Datei wurde
+    seitdem nur verlängert). Gibt (digest, offset) zurück oder None; ab offset ist neu zu lesen.
+    """
+    if not parquet_available() or not os.path.isdir(cache_dir):
+        return None
+    for entry in os.listdir(cache_dir):
+        if entry.endswith(".tmp"):
+            continue
+        extent = cached_extent(cache_dir, entry)
+        if extent is None:
+            continue
+        offset, length = extent
+        # Nur an einer Zeilengrenze anschließen, sonst wäre die letzte alte Zeile zerschnitten
+        if not offset or length > len(source) or source[offset - 1:offset] != b"\n":
+            continue
+        if source_digest(memoryview(source)[:length]) == entry:
+            return entry, offset
+    return None
+
+
+def load_state(cache_dir, digest):
+    """Gespeicherter Phasen-Zustand eines Cache-Eintrags oder None, wenn nicht lesbar."""
+    try:
+        return pd.read_parquet(os.path.join(cache_dir, digest, f"{STATE_TABLE}.parquet"))
+    except (OSError, ValueError):
+        # Zustand fehlt oder ist beschädigt -> vollständig neu parsen
+        return None
+
+
+def appended_source(source, offset, end):
+    """Kopfzeile + die Bytes zwischen offset und end: eine eigenständige CSV nur mit den neuen Zeilen."""
+    return source[:source.index(b"\n") + 1] + source[offset:end]
+
+
+def appends_in_order(old_df, new_df):
+    """
+    Ob die angehängten Zeilen pro Gerät nicht vor der letzten gecachten Zeile desselben Geräts
+    liegen. Der Phasen-Zustand ist pro Gerät: leicht versetzte Uhren verschiedener Öfen stören nicht.
+    """
+    if new_df.empty or old_df.empty:
+        return True
+    last = old_df.groupby("row_name", observed=True)["timestamp"].max()
+    first = new_df.groupby("row_name", observed=True)["timestamp"].min()
+    last.index = last.index.astype(str)
+    first.index = first.index.astype(str)
+    return not (first < last.reindex(first.index)).any()
+
+
+def append_tables(old, new):
+    """
+    Führt (df, preheats, runs, registry) des gecachten Stands und der angehängten Zeilen zusammen.
+    Die neuen Intervalle müssen mit dem Zustand des alten Stands bestimmt worden sein.
+    """
+    df = concat_frames([old[0], new[0]])
+    # Neue Zeilen eines Geräts können vor alten Zeilen eines anderen liegen: wieder nach Zeit
+    # sortieren (cycle_views sucht per searchsorted in sortierten Zyklusnummern)
+    ts = df["timestamp"].to_numpy()
+    if (ts[1:] < ts[:-1]).any():
+        df = df.iloc[np.argsort(ts, kind="stable")].reset_index(drop=True)
+    preheats = IntervalStore(concat_frames([old[1].table, new[1].table]))
+    runs = IntervalStore(concat_frames([old[2].table, new[2].table]))
+    devices = pd.concat([old[3].table, new[3].table], ignore_index=True).drop_duplicates("row_name")
+    return df, preheats, runs, DeviceRegistry(devices)
+
+
+# ---------------------------------------------------------------
+# Tabellen einer CSV: Cache-Treffer, angehängte Zeilen oder vollständig einlesen
+# ---------------------------------------------------------------
+def _same_file(a, b):
+    return (a.st_size, a.st_mtime_ns) == (b.st_size, b.st_mtime_ns)
+
+
+def load_tables(file_path, parse, incremental=False):
+    """
+    (df, preheats, runs, registry) einer CSV – aus dem Parquet-Cache, im Anhänge-Modus nur um die
+    neuen Zeilen ergänzt, sonst vollständig eingelesen. Dazu der Zeitpunkt, vor dem sich seit dem
+    letzten Lauf nichts geändert hat (None = alles neu zeichnen): Gibt (tabellen, digest, base,
+    unchanged_before) zurück, base = Inhalts-Hash des Stands, auf den sich unchanged_before bezieht.
+    parse(quelle, state): CSV (Pfad oder Bytes) -> Tabellen, Phasen ab state (main.load_and_clean_csv).
+    """
+    stat = os.stat(file_path)
+    if incremental:
+        # Der Anhänge-Modus schneidet die Bytes (bekannter Anfang, angehängter Rest): einmal ganz lesen
+        with open(file_path, "rb") as f:
+            source = f.read()
+        digest = source_digest(source)
+    else:
+        # Blockweise hashen und vom Pfad parsen: Rohbytes und Tabelle liegen nie gleichzeitig im Speicher
+        source = None
+        digest = file_digest(file_path)
+    length = len(source) if source is not None else stat.st_size
+    # Anhänge-Modus: eine letzte Zeile ohne Zeilenumbruch wird gelesen, aber nicht in den Cache
+    # übernommen – ist sie beim nächsten Lauf weitergeschrieben, wird sie dann vollständig gelesen
+    end = complete_length(source) if incremental else length
+
+    # Unveränderte CSV (gleicher Inhalts-Hash) -> bereinigte Tabellen direkt aus dem Parquet-Cache
+    cache_dir = sidecar_dir(file_path)
+    cached = load_cached(cache_dir, digest)
+    extent = cached_extent(cache_dir, digest) if cached is not None else None
+    if cached is not None and extent is None:
+        cached = None
+    # Phasen-Zustand am Ende der gecachten Tabellen
+    state = None
+    if cached is not None and extent[0] < length:
+        # Treffer ohne die letzte Zeile: sie wird mit dem gespeicherten Zustand gelesen
+        state = load_state(cache_dir, digest)
+        if state is None:
+            cached = None
+    prefix = cached_prefix(cache_dir, source) if cached is None and incremental else None
+
+    # Anhänge-Modus: alles vor diesem Zeitpunkt ist seit dem letzten Lauf gleich geblieben
+    unchanged_before = None
+    base = None
+    # Angehängte Tabellen (bestimmen unchanged_before)
+    fresh = []
+
+    if cached is not None:
+        print(f"⚡ Aus Cache geladen: {cache_dir}")
+        end = extent[0]
+        if incremental:
+            unchanged_before, base = pd.Timestamp.max, digest
+    elif prefix is not None:
+        # Datei wurde nur verlängert: nur die neuen Zeilen parsen, Phasen mit dem gespeicherten Zustand fortsetzen
+        prefix_digest, offset = prefix
+        old = load_cached(cache_dir, prefix_digest)
+        old_state = load_state(cache_dir, prefix_digest)
+        if old is None or old_state is None:
+            print("⚠️ Cache des bisherigen Stands nicht lesbar – vollständiges Einlesen")
+        else:
+            new = parse(appended_source(source, offset, end), old_state)
+            if appends_in_order(old[0], new[0]):
+                cached = append_tables(old, new)
+                state = phase_state(new[0], old_state)
+                store_cached(cache_dir, digest, *cached, state=state, offset=end, length=length)
+                fresh.append(new)
+                base = prefix_digest
+                print(f"➕ {len(new[0])} neue Zeilen angehängt ({end - offset} Bytes)")
+            else:
+                print("⚠️ Angehängte Zeilen liegen zeitlich vor dem bisherigen Stand ihres Geräts – vollständiges Einlesen")
+
+    if cached is None:
+        cached = parse(source[:end] if source is not None else file_path)
+        state = phase_state(cached[0])
+        # Vom Pfad geparst: nur cachen, wenn die Datei währenddessen nicht geändert wurde
+        if source is not None or _same_file(os.stat(file_path), stat):
+            store_cached(cache_dir, digest, *cached, state=state, offset=end, length=length)
+
+    if end < length:
+        # Letzte Zeile ohne Zeilenumbruch: an die gecachten Tabellen anhängen, selbst nicht cachen.
+        # Fehlen ihr noch Felder, wird sie gerade geschrieben -> erst beim nächsten Lauf lesen
+        if source is not None:
+            tail_source = appended_source(source, end, length)
+        else:
+            # Cache-Treffer ohne Rohbytes: nur Kopfzeile und Schlusszeile lesen
+            with open(file_path, "rb") as f:
+                tail_source = f.readline()
+                f.seek(end)
+                tail_source += f.read(length - end)
+        if complete_row(tail_source, tail_source.index(b"\n") + 1):
+            tail = parse(tail_source, state)
+            cached = append_tables(cached, tail)
+            if fresh:
+                fresh.append(tail)
+        else:
+            print("⏳ Letzte Zeile noch unvollständig – wird beim nächsten Lauf gelesen")
+
+    if fresh:
+        starts = pd.concat([t for new in fresh for t in (new[0]["timestamp"], new[1].table["start"], new[2].table["start"])])
+        unchanged_before = starts.min() if starts.notna().any() else pd.Timestamp.max
+    return cached, digest, base, unchanged_before
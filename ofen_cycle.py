@@ -0,0 +1,159 @@
+# ofen_cycle.py
+# 24h-Zyklus (Standard 22:00-22:00): Zeitstempel auf die Zyklus-Achse legen
+# ---------------------------------------------------------------
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from ofen_phases import DevicePartition, IntervalStore
+
+CYCLE_START_HOUR = 22
+
+NS_PER_HOUR = 3600 * 10**9
+NS_PER_DAY = 24 * NS_PER_HOUR
+
+
+def cycle_bounds(earliest_timestamp, start_hour=CYCLE_START_HOUR):
+    """Beginn und Ende des 24h-Zyklus, in dem der früheste Zeitstempel liegt."""
+    # Zyklusbeginn (start_hour) am Tag des frühesten Eintrags
+    start_time_base = earliest_timestamp.replace(hour=start_hour, minute=0, second=0, microsecond=0, nanosecond=0)
+
+    if earliest_timestamp.hour < start_hour:
+        # Wenn der früheste Eintrag VOR 22:00 liegt (z.B. 10:00 am 25.10.),
+        # dann war 22:00 Uhr am VOR-Tag der Start des Zyklus.
+        cycle_start = start_time_base - pd.Timedelta(days=1)
+    else:
+        # Wenn der früheste Eintrag NACH 22:00 liegt (z.B. 23:00 am 25.10.),
+        # dann ist dieser 22:00-Uhr-Zeitpunkt der Start des Zyklus.
+        cycle_start = start_time_base
+
+    # Das Ende ist 24 Stunden nach dem Start
+    return cycle_start, cycle_start + pd.Timedelta(hours=24)
+
+
+def fold_to_cycle(values, cycle_start, start_hour=CYCLE_START_HOUR):
+    """
+    Legt eine ganze datetime64-Spalte auf die Zyklus-Achse (Uhrzeit >= start_hour -> Starttag
+    des Zyklus, sonst Folgetag; die Uhrzeit bleibt erhalten). Reine Ganzzahl-Arithmetik auf
+    Nanosekunden: Versatz seit dem letzten Zyklusbeginn (mod 24h) + Zyklusbeginn.
+    """
+    values = pd.Series(values)
+    ns = values.to_numpy(dtype="datetime64[ns]").view("int64")
+    offset = np.mod(ns - start_hour * NS_PER_HOUR, NS_PER_DAY)
+    folded = (pd.Timestamp(cycle_start).value + offset).view("datetime64[ns]")
+    return pd.Series(folded, index=values.index, name=values.name)
+
+
+# ---------------------------------------------------------------
+# Mehrtages-Modus: ein Zyklus pro Produktionstag
+# ---------------------------------------------------------------
+def cycle_ids(values, start_hour=CYCLE_START_HOUR):
+    """Zyklus-Nummer pro Zeitstempel (Tage seit 1970 des jeweiligen Zyklusbeginns)."""
+    ns = pd.Series(values).to_numpy(dtype="datetime64[ns]").view("int64")
+    return np.floor_divide(ns - start_hour * NS_PER_HOUR, NS_PER_DAY)
+
+
+def cycle_bounds_of(cycle_id, start_hour=CYCLE_START_HOUR):
+    start = pd.Timestamp(int(cycle_id) * NS_PER_DAY + start_hour * NS_PER_HOUR)
+    return start, start + pd.Timedelta(hours=24)
+
+
+def available_cycles(timestamps, start_hour=CYCLE_START_HOUR):
+    """Alle Zyklen, in denen Daten liegen (aufsteigend)."""
+    return np.unique(cycle_ids(timestamps, start_hour))
+
+
+def cycle_label(cycle_id, start_hour=CYCLE_START_HOUR):
+    """z.B. "Produktionstag 23.10.2025 (22.10. 22:00 bis 23.10. 22:00)" – benannt nach dem Endtag."""
+    start, end = cycle_bounds_of(cycle_id, start_hour)
+    return f"Produktionstag {end.strftime('%d.%m.%Y')} ({start.strftime('%d.%m. %H:%M')} bis {end.strftime('%d.%m. %H:%M')})"
+
+
+def split_intervals(table, start_hour=CYCLE_START_HOUR):
+    """
+    Trennt Intervalle an den Zyklusgrenzen auf (ein Lauf über 22:00 wird zu zwei Teilen).
+    Ergebnis: gleiche Spalten plus cycle (Zyklus-Nummer des Teilstücks), nach cycle sortiert.
+    """
+    s = table["start"].to_numpy(dtype="datetime64[ns]").view("int64")
+    e = table["end"].to_numpy(dtype="datetime64[ns]").view("int64")
+    c0 = np.floor_divide(s - start_hour * NS_PER_HOUR, NS_PER_DAY)
+    # Ein Ende genau auf der Grenze gehört noch zum vorherigen Zyklus
+    c1 = np.floor_divide(np.maximum(e - 1, s) - start_hour * NS_PER_HOUR, NS_PER_DAY)
+    n = c1 - c0 + 1
+
+    rep = np.repeat(np.arange(len(table)), n)
+    k = np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n)
+    cycle = c0[rep] + k
+    cs = cycle * NS_PER_DAY + start_hour * NS_PER_HOUR
+
+    pieces = table.iloc[rep].reset_index(drop=True)
+    pieces["start"] = np.maximum(s[rep], cs).view("datetime64[ns]")
+    pieces["end"] = np.minimum(e[rep], cs + NS_PER_DAY).view("datetime64[ns]")
+    pieces["cycle"] = cycle
+    return pieces.iloc[np.argsort(cycle, kind="stable")].reset_index(drop=True)
+
+
+@dataclass
+class CycleView:
+    """Alles, was zum Zeichnen eines Zyklus gebraucht wird (Daten + Intervalle auf der Zyklus-Achse)."""
+    start: pd.Timestamp
+    end: pd.Timestamp
+    partition: DevicePartition
+    preheats: IntervalStore
+    runs: IntervalStore
+    cycle_id: object = None  # None = alle Tage auf einen Zyklus gelegt
+
+    @property
+    def label(self):
+        return f"{self.start.strftime('%d.%m. %H:%M')} bis {self.end.strftime('%d.%m. %H:%M')}"
+
+
+def folded_view(df, preheats, runs, start_hour=CYCLE_START_HOUR):
+    """Bisheriges Verhalten: alle Daten auf den Zyklus des frühesten Zeitstempels legen."""
+    cycle_start, cycle_end = cycle_bounds(df["timestamp"].min(), start_hour)
+
+    # Zeitstempel einmal vektorisiert auf den Zyklus legen – Daten und Intervalle gleichermaßen.
+    # Danach einmalig nach Gerät und Zyklus-Zeit aufteilen: pro Gerät ein fertig sortierter Slice
+    partition = DevicePartition(
+        df.assign(cycle_time=fold_to_cycle(df["timestamp"], cycle_start, start_hour)), time_column="cycle_time"
+    )
+    preheats_adj = preheats.folded(lambda ts: fold_to_cycle(ts, cycle_start, start_hour))
+    runs_adj = runs.folded(lambda ts: fold_to_cycle(ts, cycle_start, start_hour))
+    return CycleView(cycle_start, cycle_end, partition, preheats_adj, runs_adj)
+
+
+def _cycle_slices(ids):
+    uniq = np.unique(ids)
+    lo = np.searchsorted(ids, uniq, side="left")
+    hi = np.searchsorted(ids, uniq, side="right")
+    return {c: slice(a, b) for c, a, b in zip(uniq, lo, hi)}
+
+
+def cycle_views(df, preheats, runs, start_hour=CYCLE_START_HOUR, only=None):
+    """
+    Ein CycleView pro Zyklus mit Daten (Mehrtages-Modus), in einem Durchgang über das nach
+    timestamp sortierte df. Zeitstempel bleiben echt (kein Falten), Intervalle über 22:00 werden
+    an der Grenze geteilt. only: optional eine einzelne Zyklus-Nummer.
+    """
+    ids = cycle_ids(df["timestamp"], start_hour)
+    rows = _cycle_slices(ids)
+    ph = split_intervals(preheats.table, start_hour)
+    ru = split_intervals(runs.table, start_hour)
+    ph_rows = _cycle_slices(ph["cycle"].to_numpy())
+    ru_rows = _cycle_slices(ru["cycle"].to_numpy())
+    empty = slice(0, 0)
+
+    for cycle_id, sl in rows.items():
+        if only is not None and cycle_id != only:
+            continue
+        start, end = cycle_bounds_of(cycle_id, start_hour)
+        partition = DevicePartition(df.iloc[sl])
+        partition.frame["cycle_time"] = partition.frame["timestamp"]
+        yield CycleView(
+            start, end, partition,
+            IntervalStore(ph.iloc[ph_rows.get(cycle_id, empty)]),
+            IntervalStore(ru.iloc[ru_rows.get(cycle_id, empty)]),
+            cycle_id,
+        )
@@ -0,0 +1,100 @@
+# ofen_downsample.py
+# Temperaturkurven vor dem Zeichnen ausdünnen (Min/Max-Hüllkurve pro Zeit-Bucket)
+# ---------------------------------------------------------------
+
+import numpy as np
+
+# Punkte pro Kurve: ein 24h-Diagramm ist nur ~1000-2000 Pixel breit
+DEFAULT_MAX_POINTS = 2000
+
+
+def _gap_edges(valid, segment):
+    """
+    Positionen an Lücken-Rändern (NaN <-> Wert), damit Unterbrechungen der Linie erhalten bleiben –
+    höchstens ein Randpaar pro Abschnitt, sonst sprengen häufige Lücken das Punktebudget.
+    """
+    edge = np.flatnonzero(valid[1:] != valid[:-1])
+    edge = edge[np.unique(segment[edge], return_index=True)[1]]
+    return np.concatenate([edge, edge + 1])
+
+
+def minmax_indices(x, y, max_points=DEFAULT_MAX_POINTS):
+    """
+    Indizes einer Min/Max-Hüllkurve: die Zeitachse wird in max_points/4 gleich breite Buckets
+    geteilt, pro Bucket bleiben erster, letzter, kleinster und größter Punkt sowie höchstens ein
+    Lückenrand-Paar – bei vielen Lücken also bis zu 1,5 * max_points Punkte. Optisch
+    verlustfrei, solange ein Bucket nicht breiter als ein Pixel ist.
+    x: int64 (ns) oder datetime64, y: float; Reihenfolge bleibt die der Eingabe.
+    """
+    n = len(y)
+    if n <= max_points:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype="datetime64[ns]").view("int64")
+    y = np.asarray(y, dtype="float64")
+    buckets = max(max_points // 4, 1)
+    x0 = x.min()
+    bucket = ((x - x0) / (x.max() - x0 + 1) * buckets).astype("int64")
+    return _bucket_extrema(bucket, y)
+
+
+def _bucket_extrema(bucket, y):
+    """Erster, letzter, kleinster und größter Punkt pro zusammenhängendem Bucket-Abschnitt + ein Lückenrand."""
+    n = len(y)
+    # Zusammenhängende Abschnitte gleichen Buckets (funktioniert auch bei gefalteten Zeiten)
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], n] - 1
+    segment = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, n]))
+
+    valid = ~np.isnan(y)
+    low = np.where(valid, y, np.inf)
+    high = np.where(valid, y, -np.inf)
+    # Erste Position pro Abschnitt, die das Minimum bzw. Maximum trägt
+    is_min = np.flatnonzero(low == np.minimum.reduceat(low, starts)[segment])
+    is_max = np.flatnonzero(high == np.maximum.reduceat(high, starts)[segment])
+    argmin = is_min[np.unique(segment[is_min], return_index=True)[1]]
+    argmax = is_max[np.unique(segment[is_max], return_index=True)[1]]
+
+    return np.unique(np.concatenate([starts, ends, argmin, argmax, _gap_edges(valid, segment)]))
+
+
+def fixed_bucket_indices(x, y, width, origin=0):
+    """
+    Wie minmax_indices, aber mit fester Bucket-Breite width (ns) ab origin statt fester Anzahl:
+    unabhängig davon, wie viele Zeilen gerade vorliegen (Vorausdünnen Stück für Stück).
+    """
+    n = len(y)
+    if n == 0:
+        return np.arange(0)
+    x = np.asarray(x, dtype="datetime64[ns]").view("int64")
+    return _bucket_extrema(np.floor_divide(x - origin, width), np.asarray(y, dtype="float64"))
+
+
+def step_indices(y):
+    """
+    Indizes einer Stufenkurve (z.B. Soll °C), die sie exakt wiedergeben: erster und letzter
+    Punkt sowie beide Punkte an jeder Wertänderung (letzter alter, erster neuer Wert).
+    """
+    y = np.asarray(y, dtype="float64")
+    n = len(y)
+    if n == 0:
+        return np.arange(0)
+    prev, cur = y[:-1], y[1:]
+    change = np.flatnonzero(~((prev == cur) | (np.isnan(prev) & np.isnan(cur)))) + 1
+    return np.unique(np.concatenate([[0, n - 1], change - 1, change]))
+
+
+def downsample_indices(x, y, max_points=DEFAULT_MAX_POINTS, steps=False):
+    """
+    Indizes der zu zeichnenden Punkte einer Kurve. steps=True: Stufenkanten exakt erhalten
+    (fällt auf die Hüllkurve zurück, wenn die Kurve keine Stufenkurve ist).
+    max_points=None/0: keine Ausdünnung.
+    """
+    n = len(y)
+    if not max_points or n <= max_points:
+        return np.arange(n)
+    if steps:
+        idx = step_indices(y)
+        if len(idx) <= max_points:
+            return idx
+    return minmax_indices(x, y, max_points)
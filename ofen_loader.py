@@ -0,0 +1,465 @@
+# ofen_loader.py
+# Gemeinsame Lade- und Bereinigungsfunktionen für main.py, dashboard_app.py und ofen_stream.py
+# ---------------------------------------------------------------
+
+import csv
+import hashlib
+import io
+import re
+from dataclasses import dataclass
+
+import chardet
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# ---------------------------------------------------------------
+# CSV-Dialekt erkennen (Encoding + Trennzeichen)
+# ---------------------------------------------------------------
+ENCODINGS = ["utf-8-sig", "cp1252", "latin1"]
+SEPS = [";", ",", "\t"]
+MIN_COLUMNS = 5  # Zeit, Gerät, Meldung, Soll, Ist
+SNIFF_BYTES = 64 * 1024
+
+CSV_ERROR = "❌ CSV konnte nicht eingelesen werden – prüfe Trennzeichen oder Encoding."
+
+
+@dataclass(frozen=True)
+class CsvDialect:
+    encoding: str
+    sep: str
+    source: str  # "utf-8", "chardet" oder "fallback"
+
+    def describe(self):
+        sep_name = {";": "Semikolon", ",": "Komma", "\t": "Tab"}.get(self.sep, repr(self.sep))
+        return f"Encoding={self.encoding}, Trennzeichen={sep_name} ({self.source})"
+
+
+# Cache: Fingerprint der ersten SNIFF_BYTES -> CsvDialect
+_dialect_cache = {}
+
+
+def _read_head(source):
+    """Liest die ersten SNIFF_BYTES einer Datei (Pfad) oder eines Byte-Puffers."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        head = bytes(source[:SNIFF_BYTES])
+        complete = len(source) <= SNIFF_BYTES
+    else:
+        with open(source, "rb") as f:
+            head = f.read(SNIFF_BYTES + 1)
+        complete = len(head) <= SNIFF_BYTES
+        head = head[:SNIFF_BYTES]
+    # Angeschnittene letzte Zeile (evtl. mitten in einem Multibyte-Zeichen) verwerfen
+    if not complete and b"\n" in head:
+        head = head[:head.rindex(b"\n") + 1]
+    return head
+
+
+def _decodes(sample, enc):
+    try:
+        sample.decode(enc)
+        return True
+    except (UnicodeDecodeError, LookupError):
+        return False
+
+
+def _detect_encoding(sample):
+    """UTF-8 zuerst (strikt geprüft), sonst chardet, sonst die bekannten Fallbacks."""
+    if _decodes(sample, "utf-8-sig"):
+        return "utf-8-sig", "utf-8"
+    guess = chardet.detect(sample)
+    enc = (guess.get("encoding") or "").lower()
+    if enc and guess.get("confidence", 0) >= 0.5 and _decodes(sample, enc):
+        # Windows-1252 ist Obermenge von ISO-8859-1 für druckbare Zeichen
+        if enc in ("iso-8859-1", "windows-1252"):
+            enc = "cp1252"
+        return enc, "chardet"
+    for enc in ENCODINGS[1:]:
+        if _decodes(sample, enc):
+            return enc, "fallback"
+    return "latin1", "fallback"
+
+
+def _detect_sep(text):
+    """
+    Wählt das erste Trennzeichen, bei dem die Kopfzeile mind. MIN_COLUMNS Felder hat
+    und keine Datenzeile der Stichprobe mehr Felder als die Kopfzeile hat
+    (sonst würde pd.read_csv mit "Expected n fields" abbrechen).
+    """
+    lines = text.splitlines()
+    if not lines:
+        return None
+    for sep in SEPS:
+        rows = list(csv.reader(lines, delimiter=sep))
+        n_header = len(rows[0])
+        if n_header < MIN_COLUMNS:
+            continue
+        if all(len(r) <= n_header for r in rows[1:]):
+            return sep
+    return None
+
+
+def _fingerprint(head):
+    return hashlib.blake2b(head, digest_size=16).hexdigest()
+
+
+def sniff_csv_dialect(source):
+    """
+    Erkennt Encoding und Trennzeichen anhand der ersten KB.
+    Ergebnis wird pro Fingerprint (Hash der gelesenen Kopfbytes) zwischengespeichert.
+    """
+    head = _read_head(source)
+    fingerprint = _fingerprint(head)
+    if fingerprint in _dialect_cache:
+        return _dialect_cache[fingerprint]
+
+    enc, how = _detect_encoding(head)
+    sep = _detect_sep(head.decode(enc, errors="replace"))
+    if sep is None:
+        return None
+
+    dialect = CsvDialect(enc, sep, how)
+    _dialect_cache[fingerprint] = dialect
+    return dialect
+
+
+def read_csv_sniffed(source):
+    """
+    Liest eine CSV (Pfad oder Bytes) mit genau einem vollständigen Parse ein.
+    Gibt (df, dialect) zurück; wirft ValueError, wenn die Datei nicht lesbar ist.
+    """
+    dialect = sniff_csv_dialect(source)
+    if dialect is None:
+        raise ValueError(CSV_ERROR)
+
+    # Dezimalkomma (z.B. "180,5") direkt vom Parser auflösen lassen, außer Komma ist Trennzeichen
+    decimal = "," if dialect.sep != "," else "."
+
+    def _read(enc):
+        data = io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+        return pd.read_csv(data, sep=dialect.sep, encoding=enc, decimal=decimal)
+
+    # Nur falls die Stichprobe ein anderes Encoding vorgetäuscht hat
+    # (z.B. reines ASCII am Anfang, Umlaute erst später), erneut versuchen
+    tried = [dialect.encoding] + [e for e in ENCODINGS if e != dialect.encoding]
+    for enc in tried:
+        try:
+            df = _read(enc)
+        except (UnicodeDecodeError, pd.errors.ParserError):
+            continue
+        if df.shape[1] < MIN_COLUMNS:
+            break
+        if enc != dialect.encoding:
+            dialect = CsvDialect(enc, dialect.sep, "fallback")
+            _dialect_cache[_fingerprint(_read_head(source))] = dialect
+        return df, dialect
+
+    raise ValueError(CSV_ERROR)
+
+
+def iter_csv_sniffed(path, chunksize):
+    """
+    Wie read_csv_sniffed, aber als Folge von DataFrames zu höchstens chunksize Zeilen – nie
+    liegt die ganze Datei im Speicher. Gibt (chunks, dialect) zurück. Ein erneuter Versuch mit
+    anderem Encoding ist mitten in der Datei nicht möglich: nicht dekodierbare Bytes werden ersetzt.
+    """
+    dialect = sniff_csv_dialect(path)
+    if dialect is None:
+        raise ValueError(CSV_ERROR)
+    decimal = "," if dialect.sep != "," else "."
+    reader = pd.read_csv(path, sep=dialect.sep, encoding=dialect.encoding, encoding_errors="replace",
+                         decimal=decimal, chunksize=chunksize)
+    return reader, dialect
+
+
+# ---------------------------------------------------------------
+# Zeitstempel spaltenweise parsen
+# ---------------------------------------------------------------
+# MIWE-Export: "23/10/25, 08:30:00, 000" (yy/mm/dd, HH:MM:SS, fff)
+MIWE_TS_FORMAT = "%y/%m/%d,%H:%M:%S,%f"
+
+
+def parse_timestamps(values):
+    """
+    Parst die Spalte "Datum/Zeit" als Ganzes: erst ein einziger to_datetime-Aufruf
+    mit festem MIWE-Format (Leerzeichen um die Kommas werden ignoriert), danach nur
+    die Restzeilen mit dem Tag-zuerst-Parser (einmal pro eindeutigem Wert).
+    """
+    s = values.astype(str)
+    ts = pd.to_datetime(s.str.replace(" ", "", regex=False), format=MIWE_TS_FORMAT, errors="coerce")
+
+    rest = ts.isna()
+    if rest.any():
+        # Versucht Standard-Pandas-Konvertierung (Tag zuerst für europäische Formate)
+        uniq = pd.unique(s[rest])
+        parsed = pd.to_datetime(pd.Series(uniq), dayfirst=True, format="mixed", errors="coerce")
+        ts[rest] = s[rest].map(pd.Series(parsed.values, index=uniq))
+    return ts
+
+
+# ---------------------------------------------------------------
+# Temperaturen (Soll/Ist) einmalig als float32
+# ---------------------------------------------------------------
+def parse_temperatures(values):
+    """
+    Soll/Ist-Spalte als float32. Normalerweise hat read_csv (decimal=",") schon Zahlen
+    geliefert; gemischte Spalten (z.B. Punkt und Komma) werden hier einmal nachkonvertiert.
+    """
+    if not pd.api.types.is_numeric_dtype(values):
+        values = pd.to_numeric(values.astype(str).str.replace(",", "."), errors="coerce")
+    return values.astype("float32")
+
+
+# Spalten des bereinigten DataFrames; Rohtexte (Datum/Zeit, Gerät, Meldung) werden danach verworfen
+CLEAN_COLUMNS = [
+    "timestamp", "Soll °C", "Ist °C",
+    "device_type", "device_id", "herd", "row_name",
+    "event", "is_loaded", "is_started", "is_ended", "prog_num",
+]
+
+
+# ---------------------------------------------------------------
+# Gerät zerlegen (einmal pro eindeutigem Gerätetext)
+# ---------------------------------------------------------------
+def parse_device(dev):
+    m = re.match(r"^(.*?)\s*\((.*?)\)\s*$", str(dev))
+    if m:
+        return m.group(1).strip(), m.group(2).strip()
+    return str(dev), ""
+
+
+def categorical_from_uniques(codes, per_unique):
+    """Überträgt einen Wert pro eindeutigem Schlüssel per Codes auf alle Zeilen (als Categorical)."""
+    value_codes, categories = pd.factorize(pd.Series(per_unique, dtype=object))
+    return pd.Categorical.from_codes(value_codes[codes], categories=categories)
+
+
+def concat_frames(frames):
+    """
+    Hängt Tabellen mit gleichen Spalten aneinander (neuer RangeIndex). Categorical-Spalten
+    bekommen die Vereinigung der Kategorien, statt wie bei pd.concat zu object zu werden.
+    """
+    columns = {}
+    for col in frames[0].columns:
+        parts = [f[col] for f in frames]
+        if isinstance(parts[0].dtype, pd.CategoricalDtype):
+            # Leere (reine NaN-)Categoricals haben oft einen anderen Kategorien-Typ
+            filled = [p for p in parts if len(p.cat.categories)]
+            if filled:
+                parts = [p if len(p.cat.categories) else p.astype(filled[0].dtype) for p in parts]
+            columns[col] = union_categoricals(parts, ignore_order=True)
+        else:
+            columns[col] = pd.concat(parts, ignore_index=True)
+    return pd.DataFrame(columns)
+
+
+def split_device_column(devices):
+    """
+    Zerlegt die Spalte "Gerät" in device_type und device_id.
+    parse_device läuft nur einmal pro eindeutigem Gerät, die Zeilen bekommen Codes.
+    """
+    codes, uniques = pd.factorize(devices, use_na_sentinel=False)
+    parsed = [parse_device(u) for u in uniques]
+    return pd.DataFrame({
+        "device_type": categorical_from_uniques(codes, [p[0] for p in parsed]),
+        "device_id": categorical_from_uniques(codes, [p[1] for p in parsed]),
+    }, index=devices.index)
+
+
+# ---------------------------------------------------------------
+# Meldungen klassifizieren (einmal pro eindeutigem Meldungstext)
+# ---------------------------------------------------------------
+EVENT_LOADED = 1   # "Arbeitsprog" -> Programm geladen, Vorheizen beginnt
+EVENT_STARTED = 2  # "Programm gestartet"
+EVENT_ENDED = 4    # "Programmende" / "Programm beendet" / "Programm gestoppt"
+MESSAGE_COLUMNS = ["event", "is_loaded", "is_started", "is_ended", "herd", "prog_num"]
+
+_RE_LOADED = re.compile("Arbeitsprog", re.IGNORECASE)
+_RE_STARTED = re.compile("Programm gestartet", re.IGNORECASE)
+_RE_ENDED = re.compile("Programmende|Programm beendet|Programm gestoppt", re.IGNORECASE)
+_RE_HERD = re.compile(r"Herd\s*([0-9]+)")
+_RE_PROG = re.compile(r"P\s*(\d+)", re.IGNORECASE)
+_RE_PROG_ALT = re.compile(r"(?:Programm|Prog)\s+(\d+)", re.IGNORECASE)
+
+
+def extract_herd(msg):
+    m = _RE_HERD.search(str(msg))
+    return f"Herd {m.group(1)}" if m else None
+
+
+# Programmnummer aus Meldung extrahieren (z.B. "P1", "Programm 123" -> "P123")
+def extract_program_number(msg):
+    msg_str = str(msg)
+    # Suche nach "P" gefolgt von Ziffern
+    m = _RE_PROG.search(msg_str)
+    if m:
+        return f"P{m.group(1)}"
+    # Alternativ: "Programm 123" oder "Prog 123"
+    m = _RE_PROG_ALT.search(msg_str)
+    if m:
+        return f"P{m.group(1)}"
+    return None
+
+
+def classify_message(msg):
+    """Gibt (Ereignis-Bits, Herd, Programmnummer) für einen Meldungstext zurück."""
+    event = 0
+    if isinstance(msg, str):
+        if _RE_LOADED.search(msg):
+            event |= EVENT_LOADED
+        if _RE_STARTED.search(msg):
+            event |= EVENT_STARTED
+        if _RE_ENDED.search(msg):
+            event |= EVENT_ENDED
+    return event, extract_herd(msg), extract_program_number(msg)
+
+
+def classify_messages(messages):
+    """
+    Klassifiziert die Spalte "Meldung" in einem Durchgang: classify_message läuft
+    nur einmal pro eindeutigem Text, die Zeilen bekommen das Ergebnis über Codes.
+    Liefert event (Bitmaske), is_loaded/is_started/is_ended, herd und prog_num.
+    """
+    codes, uniques = pd.factorize(messages, use_na_sentinel=False)
+    classified = [classify_message(u) for u in uniques]
+    event = np.array([c[0] for c in classified], dtype="uint8")[codes]
+    return pd.DataFrame({
+        "event": event,
+        "is_loaded": (event & EVENT_LOADED) > 0,
+        "is_started": (event & EVENT_STARTED) > 0,
+        "is_ended": (event & EVENT_ENDED) > 0,
+        "herd": categorical_from_uniques(codes, [c[1] for c in classified]),
+        "prog_num": categorical_from_uniques(codes, [c[2] for c in classified]),
+    }, index=messages.index)
+
+
+# ---------------------------------------------------------------
+# Geräte-Register: eindeutige (device_type, device_id, herd)-Tripel
+# ---------------------------------------------------------------
+def clean_device_type(device_type, device_id):
+    """Geräte ohne Namen aber mit ID im Format "X/Y" automatisch als MIWE gateway setzen."""
+    device_type = str(device_type).strip()
+    device_id = str(device_id).strip()
+    if (not device_type or device_type == "0" or device_type == "nan") and device_id and "/" in device_id:
+        return "MIWE gateway"
+    return device_type
+
+
+def make_row_name(device_type, device_id, herd):
+    if "miwe ideal tc" in str(device_type).lower():
+        herd = herd if isinstance(herd, str) and herd else "kein Herd"
+        return f"{device_type} ({device_id}) - {herd}"
+    return f"{device_type} ({device_id})"
+
+
+def smart_sort_key(row_name):
+    """Sortiert Geräte logisch: zuerst nach Typ, dann nach ID-Nummer, dann nach Herd"""
+    parts = row_name.split(" - ")
+    base = parts[0]
+    herd = parts[1] if len(parts) > 1 else ""
+    match = re.match(r"^(.*?)\s*\(([^)]+)\)\s*$", base)
+    if match:
+        device_type = match.group(1).strip().lower()
+        device_id = match.group(2).strip()
+    else:
+        device_type = base.lower()
+        device_id = ""
+    if not device_type or device_type == "0" or device_type == "nan" or not device_id:
+        return ("zzz_invalid", [9999], 9999)
+    id_numbers = [int(x) if x.isdigit() else 0 for x in re.findall(r'\d+', device_id)]
+    if not id_numbers:
+        id_numbers = [9999]
+    herd_match = re.search(r"Herd\s*(\d+)", herd)
+    herd_num = int(herd_match.group(1)) if herd_match else 0
+    return (device_type, id_numbers, herd_num)
+
+
+class DeviceRegistry:
+    """
+    Ein Eintrag pro eindeutigem (device_type, device_id, herd)-Tripel mit bereinigtem
+    Gerätetyp und Zeilennamen. Reihenfolge der Diagramme = smart_sort_key der Zeilennamen.
+    """
+
+    def __init__(self, table):
+        self.table = table.reset_index(drop=True)
+        names = pd.unique(self.table["row_name"])
+        self.row_names = sorted(names, key=smart_sort_key)
+
+    @classmethod
+    def attach(cls, df):
+        """
+        Bestimmt die Tripel aus df (device_type/device_id als Categorical, herd),
+        leitet Typ und Zeilennamen nur pro Tripel ab und schreibt beides per Codes
+        zurück in df. Gibt das Register zurück.
+        """
+        herd_codes, _ = pd.factorize(df["herd"])
+        type_codes = df["device_type"].cat.codes.to_numpy().astype("int64")
+        id_codes = df["device_id"].cat.codes.to_numpy().astype("int64")
+        n_ids = len(df["device_id"].cat.categories) + 1
+        n_herds = herd_codes.max() + 2 if len(herd_codes) else 1
+        key = (type_codes * n_ids + id_codes) * n_herds + (herd_codes + 1)
+        codes, _ = pd.factorize(key)
+        _, first = np.unique(codes, return_index=True)
+
+        triples = df.iloc[first][["device_type", "device_id", "herd"]].astype(object)
+        triples["device_type"] = [clean_device_type(t, i) for t, i in zip(triples["device_type"], triples["device_id"])]
+        triples["row_name"] = [make_row_name(t, i, h) for t, i, h in zip(triples["device_type"], triples["device_id"], triples["herd"])]
+
+        df["device_type"] = categorical_from_uniques(codes, triples["device_type"].tolist())
+        df["row_name"] = categorical_from_uniques(codes, triples["row_name"].tolist())
+        return cls(triples)
+
+
+# ---------------------------------------------------------------
+# Abschnitte 2-3: Spalten zuordnen, bereinigen, Geräte/Meldungen zerlegen
+# (gemeinsam für main.py, dashboard_app.py und das stückweise Einlesen)
+# ---------------------------------------------------------------
+# Standardname -> Schlüsselwörter im Spaltennamen (Teilstring, ohne Groß-/Kleinschreibung)
+COLUMN_KEYS = {
+    "Datum/Zeit": ["Datum", "Zeit"],
+    "Gerät": ["Ger", "Gerät", "Ger„t"],
+    "Meldung": ["Meld"],
+    "Soll °C": ["Soll"],
+    "Ist °C": ["Ist"],
+}
+
+COLUMN_ERROR = "❌ Eine oder mehrere benötigte Spalten (Zeit, Gerät, Meldung, Soll, Ist) wurden nicht gefunden."
+
+
+def column_map(columns):
+    """Umbenennung Originalspalte -> Standardname anhand der Kopfzeile; ValueError, wenn eine fehlt."""
+    mapping = {}
+    for target, keys in COLUMN_KEYS.items():
+        col = next((c for c in columns if any(k.lower() in c.lower() for k in keys)), None)
+        if col is None:
+            raise ValueError(COLUMN_ERROR)
+        mapping[col] = target
+    return mapping
+
+
+def clean_frame(raw, mapping=None):
+    """
+    Rohtabelle aus read_csv -> (bereinigte Tabelle mit CLEAN_COLUMNS, nach timestamp sortiert,
+    DeviceRegistry). mapping: Ergebnis von column_map (sonst aus raw.columns bestimmt).
+    """
+    df = raw.rename(columns=column_map(raw.columns) if mapping is None else mapping)
+
+    # Zeitparsing: spaltenweise, MIWE-Format zuerst, Rest mit Tag-zuerst-Parser
+    df["timestamp"] = parse_timestamps(df["Datum/Zeit"])
+    df = df.dropna(subset=["timestamp"]).sort_values("timestamp")
+
+    # Soll/Ist einmalig als float32 (Dezimalkomma hat read_csv bereits aufgelöst)
+    df["Soll °C"] = parse_temperatures(df["Soll °C"])
+    df["Ist °C"] = parse_temperatures(df["Ist °C"])
+
+    # parse_device läuft nur einmal pro eindeutigem Gerät; Ergebnis als Categorical
+    df[["device_type", "device_id"]] = split_device_column(df["Gerät"])
+
+    # Meldungen einmal pro eindeutigem Text klassifizieren: Ereignis, Herd, Programmnummer
+    df[MESSAGE_COLUMNS] = classify_messages(df["Meldung"])
+
+    # Gerätetyp bereinigen und Zeilennamen bilden – nur pro eindeutigem (Typ, ID, Herd)-Tripel
+    registry = DeviceRegistry.attach(df)
+
+    # Nur die bereinigten, typisierten Spalten behalten (Rohtexte verwerfen)
+    return df[CLEAN_COLUMNS], registry
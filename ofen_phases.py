@@ -0,0 +1,223 @@
+# ofen_phases.py
+# Vorheiz- und Laufzeitphasen pro Ofen/Herd bestimmen (ohne Python-Schleife über Zeilen)
+# ---------------------------------------------------------------
+
+import numpy as np
+import pandas as pd
+
+from ofen_loader import concat_frames
+
+# Offener Zustand der Zustandsmaschine pro Gerät nach der letzten gelesenen Zeile
+PHASE_STATE_COLUMNS = ["row_name", "t_load", "t_start", "prog_num"]
+EVENT_INPUT_COLUMNS = ["row_name", "timestamp", "is_loaded", "is_started", "is_ended", "prog_num"]
+
+
+def _last_true(mask, dev_start):
+    """
+    Position des letzten True bis einschließlich i innerhalb desselben Geräts, sonst -1.
+    (Zeilen sind nach Gerät gruppiert, dev_start = erste Position des jeweiligen Geräts.)
+    """
+    pos = np.where(mask, np.arange(len(mask)), -1)
+    last = np.maximum.accumulate(pos) if len(pos) else pos
+    return np.where(last >= dev_start, last, -1)
+
+
+def _shift(last, dev_start):
+    """Wie _last_true, aber strikt vor i (Wert der Vorzeile im selben Gerät)."""
+    prev = np.empty_like(last)
+    if len(last):
+        prev[0] = -1
+        prev[1:] = last[:-1]
+    return np.where(prev >= dev_start, prev, -1)
+
+
+def _event_rows(part, time_column, loaded=False, started=False, with_prog=False):
+    """Künstliche Meldungszeilen (Spalten wie EVENT_INPUT_COLUMNS) aus Zeilen einer Zustandstabelle."""
+    n = len(part)
+    return pd.DataFrame({
+        "row_name": part["row_name"].reset_index(drop=True),
+        "timestamp": part[time_column].reset_index(drop=True),
+        "is_loaded": np.full(n, loaded),
+        "is_started": np.full(n, started),
+        "is_ended": np.zeros(n, dtype=bool),
+        "prog_num": part["prog_num"].reset_index(drop=True) if with_prog else pd.Categorical([None] * n),
+    })
+
+
+def _with_state(df, state):
+    """
+    Stellt einen gespeicherten Zustand als Meldungszeilen vor df: erst Programmnummer,
+    dann Start, dann Laden (ein offenes Laden liegt immer nach dem offenen Start).
+    Danach liefern extract_phases/phase_state dasselbe, als wären die alten Zeilen mitgelesen.
+    """
+    if state is None or state.empty:
+        return df
+    return concat_frames([
+        _event_rows(state[state["prog_num"].notna()], "t_start", with_prog=True),
+        _event_rows(state[state["t_start"].notna()], "t_start", started=True),
+        _event_rows(state[state["t_load"].notna()], "t_load", loaded=True),
+        df[EVENT_INPUT_COLUMNS],
+    ])
+
+
+def phase_state(df, state=None):
+    """
+    Zustand (t_load, t_start, prog_num) pro Gerät nach der letzten Zeile von df, ausgehend
+    von state. Läuft nur über die Meldungszeilen; Geräte ohne offenen Zustand fehlen.
+    """
+    frame = _with_state(df, state)
+    prog = frame["prog_num"].to_numpy(dtype=object)
+    has_prog = frame["prog_num"].notna().to_numpy()
+    loaded = frame["is_loaded"].to_numpy(dtype=bool)
+    started = frame["is_started"].to_numpy(dtype=bool)
+    ended = frame["is_ended"].to_numpy(dtype=bool)
+    events = np.flatnonzero(loaded | started | ended | has_prog)
+
+    current = {}
+    names = frame["row_name"].to_numpy(dtype=object)
+    ts = frame["timestamp"].to_numpy()
+    for i in events:
+        t_load, t_start, prog_num = current.get(names[i], (None, None, None))
+        if has_prog[i]:
+            prog_num = prog[i]
+        if loaded[i]:
+            t_load = ts[i]
+        if started[i]:
+            t_load, t_start = None, ts[i]
+        if ended[i] and t_start is not None:
+            t_start = prog_num = None
+        current[names[i]] = (t_load, t_start, prog_num)
+
+    open_states = [(name, *s) for name, s in current.items() if any(v is not None for v in s)]
+    table = pd.DataFrame(open_states, columns=PHASE_STATE_COLUMNS)
+    categories = frame["row_name"].astype("category").cat.categories
+    return pd.DataFrame({
+        "row_name": pd.Categorical(table["row_name"], categories=categories),
+        "t_load": pd.to_datetime(table["t_load"]).astype("datetime64[ns]"),
+        "t_start": pd.to_datetime(table["t_start"]).astype("datetime64[ns]"),
+        "prog_num": pd.Categorical(table["prog_num"]),
+    })
+
+
+def extract_phases(df, state=None):
+    """
+    Bestimmt Vorheizen (Laden -> Start) und Laufzeiten (Start -> Ende, mit Programmnummer)
+    pro row_name als IntervalStore. Gleiche Semantik wie die frühere Zustandsmaschine pro Gerät:
+
+        Programmnummer merken, wenn vorhanden
+        Laden:  t_load = t
+        Start:  wenn t_load -> Vorheizen (t_load, t), t_load = None; t_start = t
+        Ende:   wenn t_start -> Lauf (t_start, t, prog_num), t_start = prog_num = None
+
+    Erwartet df nach timestamp sortiert mit den Spalten row_name (Categorical), timestamp,
+    is_loaded, is_started, is_ended, prog_num. Gibt (preheats, runs) zurück.
+    state: offener Zustand aus phase_state() eines früheren Teils der Datei (Anhänge-Modus).
+    """
+    df = _with_state(df, state)
+    names = df["row_name"]
+    if not isinstance(names.dtype, pd.CategoricalDtype):
+        names = names.astype("category")
+    categories = names.cat.categories
+
+    # Stabil nach Gerät gruppieren, innerhalb des Geräts bleibt die Zeitreihenfolge
+    dev = names.cat.codes.to_numpy()
+    order = np.argsort(dev, kind="stable")
+    dev = dev[order]
+    ts = df["timestamp"].to_numpy()[order]
+    loaded = df["is_loaded"].to_numpy(dtype=bool)[order]
+    started = df["is_started"].to_numpy(dtype=bool)[order]
+    ended = df["is_ended"].to_numpy(dtype=bool)[order]
+    has_prog = df["prog_num"].notna().to_numpy()[order]
+
+    n = len(dev)
+    new_dev = np.ones(n, dtype=bool)
+    new_dev[1:] = dev[1:] != dev[:-1]
+    dev_start = np.maximum.accumulate(np.where(new_dev, np.arange(n), 0)) if n else np.zeros(0, dtype=int)
+
+    # Vorheizen: letztes Laden nach dem vorherigen Start (bzw. seit Gerätebeginn)
+    last_load = _last_true(loaded, dev_start)
+    prev_start = _shift(_last_true(started, dev_start), dev_start)
+    is_preheat = started & (last_load >= 0) & (last_load > prev_start)
+    ph_end = np.flatnonzero(is_preheat)
+    ph_start = last_load[ph_end]
+
+    # Lauf: letzter Start nach dem vorherigen Ende (jedes Ende setzt t_start zurück)
+    last_start = _last_true(started, dev_start)
+    prev_end = _shift(_last_true(ended, dev_start), dev_start)
+    is_run = ended & (last_start >= 0) & (last_start > prev_end)
+    run_end = np.flatnonzero(is_run)
+    run_start = last_start[run_end]
+
+    # Programmnummer: letzte Nummer nach dem vorherigen (abgeschlossenen) Lauf
+    last_prog = _last_true(has_prog, dev_start)
+    prev_run = _shift(_last_true(is_run, dev_start), dev_start)
+    prog_pos = last_prog[run_end]
+    prog_ok = (prog_pos >= 0) & (prog_pos > prev_run[run_end])
+    prog_values = df["prog_num"].to_numpy(dtype=object)[order]
+    run_prog = np.where(prog_ok, prog_values[np.where(prog_ok, prog_pos, 0)], None) if len(run_end) else []
+
+    preheats = pd.DataFrame({
+        "row_name": pd.Categorical.from_codes(dev[ph_end], categories=categories),
+        "start": ts[ph_start],
+        "end": ts[ph_end],
+    })
+    runs = pd.DataFrame({
+        "row_name": pd.Categorical.from_codes(dev[run_end], categories=categories),
+        "start": ts[run_start],
+        "end": ts[run_end],
+        "prog_num": pd.Categorical(run_prog),
+    })
+    return IntervalStore(preheats), IntervalStore(runs)
+
+
+def _device_slices(sorted_codes, categories):
+    """Zeilenbereich pro row_name in einem nach Gerätecodes sortierten Array."""
+    positions = np.arange(len(categories))
+    lo = np.searchsorted(sorted_codes, positions, side="left")
+    hi = np.searchsorted(sorted_codes, positions, side="right")
+    return {name: slice(a, b) for name, a, b in zip(categories, lo, hi) if b > a}
+
+
+class IntervalStore:
+    """
+    Intervalltabelle (Spalten start, end, ggf. prog_num) nach row_name sortiert,
+    mit Zeilenbereich pro Gerät: for_device() liefert nur die eigenen Intervalle.
+    """
+
+    def __init__(self, table):
+        codes = table["row_name"].cat.codes.to_numpy()
+        order = np.argsort(codes, kind="stable")
+        self.table = table.iloc[order].reset_index(drop=True)
+        self._slices = _device_slices(codes[order], self.table["row_name"].cat.categories)
+
+    def __len__(self):
+        return len(self.table)
+
+    def for_device(self, row_name):
+        return self.table.iloc[self._slices.get(row_name, slice(0, 0))]
+
+    def folded(self, fold):
+        """Neuer IntervalStore mit start/end durch fold (vektorisiert, einmal für alle Intervalle)."""
+        table = self.table.copy()
+        table["start"] = fold(table["start"])
+        table["end"] = fold(table["end"])
+        return IntervalStore(table)
+
+
+class DevicePartition:
+    """
+    Einmalige Aufteilung von df nach row_name (dann time_column) mit Zeilenbereich pro Gerät:
+    for_device() liefert einen Slice ohne Kopie statt df[df["row_name"] == name].copy().
+    """
+
+    def __init__(self, df, time_column="timestamp"):
+        codes = df["row_name"].cat.codes.to_numpy()
+        order = np.lexsort((df[time_column].to_numpy(), codes))
+        self.frame = df.take(order)
+        self._slices = _device_slices(codes[order], df["row_name"].cat.categories)
+
+    def __len__(self):
+        return len(self._slices)
+
+    def for_device(self, row_name):
+        return self.frame.iloc[self._slices.get(row_name, slice(0, 0))]
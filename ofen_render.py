@@ -0,0 +1,642 @@
+# ofen_render.py
+# Diagramme pro Ofen/Herd (Gantt + Temperatur) und HTML-Dashboard
+# Gemeinsam für main.py und dashboard_app.py
+# ---------------------------------------------------------------
+
+import gzip
+import html
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.offline import get_plotlyjs, get_plotlyjs_version
+from plotly.subplots import make_subplots
+
+from ofen_downsample import DEFAULT_MAX_POINTS, downsample_indices
+
+# Definiere festen Y-Achsen-Bereich
+Y_AXIS_MAX = 350
+Y_AXIS_MIN = 0
+
+# Offline-Modus: plotly.js einmal im <head> statt CDN-Link pro Diagramm
+OFFLINE_HEAD = '\n    <script type="text/javascript">{plotlyjs}</script>'
+
+# Client-Rendering mit CDN: plotly.js einmal im <head>
+CDN_HEAD = '\n    <script charset="utf-8" src="https://cdn.plot.ly/plotly-{version}.min.js"></script>'
+
+# Komprimierte Varianten der Ausgabe (Dateiendung pro Verfahren)
+COMPRESSIONS = {"gzip": ".gz", "br": ".br"}
+
+CHART_SEPARATOR = "\n<hr style='margin:40px 0;'>\n"
+
+# Gemeinsame Figur: Höhe pro Gerät und Abstand zwischen den Zeilen in Pixel
+ROW_HEIGHT = 350
+ROW_GAP = 80
+
+# Ab so vielen Temperaturpunkten pro Figur WebGL (Scattergl) statt SVG
+WEBGL_MIN_POINTS = 20000
+
+PREHEAT_COLOR = "rgba(255,0,0,0.3)"
+RUN_COLOR = "rgba(0,200,0,0.3)"
+
+IST_LINE = dict(color="orange", width=2)
+SOLL_LINE = dict(color="blue", dash="dot", width=1.5)
+
+# Programmnummer in der Mitte eines Laufs (x, text und Achsenbezug kommen pro Lauf dazu)
+PROG_LABEL = dict(
+    y=0.95,
+    showarrow=False,
+    font=dict(size=14, color="darkgreen"),
+    bgcolor="rgba(255,255,255,0.7)",
+    bordercolor="darkgreen",
+    borderwidth=1,
+    borderpad=3
+)
+
+# Layout eines Einzeldiagramms (ohne Titel); gilt auch für das Client-Rendering
+DEVICE_LAYOUT = dict(
+    xaxis_title="Zeit",
+    yaxis_title="Temperatur °C",
+    height=350,
+    margin=dict(l=80, r=30, t=50, b=40),
+    template="plotly_white",
+    legend=dict(orientation="h", y=-0.25),
+    # X-Achse: Bereich kommt pro Zyklus dazu (cycle_axis)
+    xaxis=dict(
+        type='date',
+        tickformat="%H:%M",
+        ticklabelmode="period",
+        dtick=3600000 * 2 # Ticks alle 2 Stunden
+    ),
+    # Fester Y-Achsen-Bereich
+    yaxis=dict(
+        range=[Y_AXIS_MIN, Y_AXIS_MAX],
+        dtick=50 # Ticks alle 50 Grad
+    )
+)
+
+PAGE_TEMPLATE = """
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>{title}</title>{head}
+</head>
+<body style="font-family:Arial; margin:20px;">
+    <h1>{title}</h1>
+    <p>Vorheizen = Rot | Laufzeit = Grün | Ist/Soll-Temperatur = Linien</p>
+    {charts}
+</body>
+</html>
+"""
+
+
+# Kopf und Fuß der Seite, damit die Diagramme dazwischen einzeln geschrieben werden können
+PAGE_HEADER, _, PAGE_FOOTER = PAGE_TEMPLATE.partition("{charts}")
+
+
+def cycle_axis(x_range_start, x_range_end):
+    """
+    X-Achse fest auf den 24h-Zyklus; auch "Autoscale" im Browser zeigt wieder den ganzen
+    Zyklus (statt Hilfspunkten in den Daten).
+    """
+    return dict(range=[x_range_start, x_range_end], autorangeoptions=dict(include=[x_range_start, x_range_end]))
+
+
+def scatter_class(n_points, webgl=None):
+    """
+    go.Scattergl oder go.Scatter für die Temperaturkurven einer Figur.
+    webgl=None: automatisch ab WEBGL_MIN_POINTS Punkten, True/False erzwingt den Modus.
+    Rechtecke und Annotationen liegen im Layout und funktionieren mit beiden.
+    """
+    if webgl is None:
+        webgl = n_points >= WEBGL_MIN_POINTS
+    return go.Scattergl if webgl else go.Scatter
+
+
+def temperature_curves(x, subset, max_points=DEFAULT_MAX_POINTS):
+    """
+    (x, y) pro Temperaturkurve, ausgedünnt auf etwa max_points Punkte (mit Messlücken bis 1,5-fach):
+    Ist °C als Min/Max-Hüllkurve, Soll °C mit exakt erhaltenen Stufenkanten.
+    Kurven ganz ohne Werte entfallen.
+    """
+    curves = {}
+    x_values = x.to_numpy()
+    for column, steps in (("Ist °C", False), ("Soll °C", True)):
+        y = subset[column]
+        if not y.notna().any():
+            continue
+        idx = downsample_indices(x_values, y.to_numpy(), max_points, steps=steps)
+        curves[column] = (x.iloc[idx], y.iloc[idx])
+    return curves
+
+
+def build_device_figure(name, subset, preheats, runs, x_range_start, x_range_end, webgl=None,
+                        max_points=DEFAULT_MAX_POINTS):
+    """
+    Diagramm für ein Gerät. subset: Slice mit cycle_time, Ist °C, Soll °C;
+    preheats/runs: nur die Intervalle dieses Geräts, bereits auf der Zyklus-Achse.
+    """
+    # Zeitstempel auf das Datum des Zyklus gesetzt (cycle_time, pro Gerät bereits sortiert);
+    # Soll/Ist sind bereits float32
+    fig = go.Figure()
+    curves = temperature_curves(subset["cycle_time"], subset, max_points)
+    scatter = scatter_class(sum(len(x) for x, _ in curves.values()), webgl)
+
+    # Temperaturkurven
+    if "Ist °C" in curves:
+        x, y = curves["Ist °C"]
+        fig.add_trace(scatter(
+            x=x, y=y,
+            mode="lines", name="Ist °C", line=IST_LINE
+        ))
+
+    if "Soll °C" in curves:
+        x, y = curves["Soll °C"]
+        fig.add_trace(scatter(
+            x=x, y=y,
+            mode="lines", name="Soll °C", line=SOLL_LINE
+        ))
+
+    # Vorheizen/Laufzeit-Balken + Programmnummer-Annotations
+    for s_adj, e_adj in preheats[["start", "end"]].itertuples(index=False, name=None):
+        fig.add_shape(type="rect", x0=s_adj, x1=e_adj, y0=0, y1=1,
+                      xref="x", yref="paper", fillcolor=PREHEAT_COLOR, line=dict(width=0))
+
+    for s_adj, e_adj, prog_num in runs[["start", "end", "prog_num"]].itertuples(index=False, name=None):
+        # Grünes Rechteck für Programm-Run
+        fig.add_shape(type="rect", x0=s_adj, x1=e_adj, y0=0, y1=1,
+                      xref="x", yref="paper", fillcolor=RUN_COLOR, line=dict(width=0))
+
+        # Programmnummer als Text-Annotation in der Mitte des Rechtecks
+        if pd.notna(prog_num):
+            mid_time = s_adj + (e_adj - s_adj) / 2
+            fig.add_annotation(x=mid_time, yref="paper", text=f"<b>{prog_num}</b>", **PROG_LABEL)
+
+    fig.update_layout(title=f"{name}", **DEVICE_LAYOUT)
+    fig.update_xaxes(**cycle_axis(x_range_start, x_range_end))
+    return fig
+
+
+def _render_device_part(task):
+    """Worker: ein Gerät aus reinen NumPy-Arrays zeichnen und als HTML-Fragment serialisieren."""
+    name, times, ist, soll, intervals, x_range_start, x_range_end, webgl, max_points, include_plotlyjs = task
+    subset = pd.DataFrame({"cycle_time": times, "Ist °C": ist, "Soll °C": soll})
+    preheats = pd.DataFrame(intervals["preheats"], columns=["start", "end"])
+    runs = pd.DataFrame(intervals["runs"], columns=["start", "end", "prog_num"])
+    fig = build_device_figure(name, subset, preheats, runs, x_range_start, x_range_end, webgl, max_points)
+    return fig.to_html(full_html=False, include_plotlyjs=include_plotlyjs)
+
+
+def _device_task(view, name, webgl, max_points, include_plotlyjs):
+    """Nur die Daten eines Geräts (Arrays statt des ganzen Frames) für einen Worker-Prozess."""
+    subset = view.partition.for_device(name)
+    preheats = view.preheats.for_device(name)
+    runs = view.runs.for_device(name)
+    intervals = {
+        "preheats": {"start": preheats["start"].to_numpy(), "end": preheats["end"].to_numpy()},
+        "runs": {
+            "start": runs["start"].to_numpy(),
+            "end": runs["end"].to_numpy(),
+            "prog_num": runs["prog_num"].to_numpy(dtype=object),
+        },
+    }
+    return (name, subset["cycle_time"].to_numpy(), subset["Ist °C"].to_numpy(), subset["Soll °C"].to_numpy(),
+            intervals, view.start, view.end, webgl, max_points, include_plotlyjs)
+
+
+def _process_pool(jobs):
+    """
+    ProcessPoolExecutor per fork, sonst None (dann sequentiell): main.py ist ein Skript ohne
+    __main__-Schutz und würde mit spawn in jedem Worker erneut ausgeführt.
+    """
+    if jobs <= 1 or "fork" not in multiprocessing.get_all_start_methods():
+        return None
+    return ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context("fork"))
+
+
+def iter_chart_parts(view, names, webgl=None, max_points=DEFAULT_MAX_POINTS, include_plotlyjs='cdn', jobs=1):
+    """
+    HTML-Fragmente aller Geräte eines Zyklus in der Reihenfolge von names (ohne Daten -> kein Diagramm),
+    eines nach dem anderen, sobald es fertig ist.
+    jobs > 1: Figuren parallel in Worker-Prozessen bauen und serialisieren (Reihenfolge bleibt).
+    """
+    # Slice des Geräts aus der einmaligen Aufteilung (keine Maske, keine Kopie)
+    names = [name for name in names if not view.partition.for_device(name).empty]
+
+    pool = _process_pool(jobs)
+    if pool is None:
+        for name in names:
+            fig = build_device_figure(name, view.partition.for_device(name), view.preheats.for_device(name),
+                                      view.runs.for_device(name), view.start, view.end, webgl, max_points)
+            # Plotly JS für jedes Diagramm in HTML-Teil
+            yield fig.to_html(full_html=False, include_plotlyjs=include_plotlyjs)
+        return
+
+    tasks = [_device_task(view, name, webgl, max_points, include_plotlyjs) for name in names]
+    with pool:
+        # map liefert in Eingabe-Reihenfolge -> smart_sort_key-Reihenfolge bleibt erhalten
+        yield from pool.map(_render_device_part, tasks)
+
+
+def _device_decorations(preheats, runs, xref, yref):
+    """Rechtecke (Vorheizen/Lauf) und Programmnummern eines Geräts als Layout-Dicts."""
+    shapes = [
+        dict(type="rect", x0=s_adj, x1=e_adj, y0=0, y1=1, xref=xref, yref=yref,
+             fillcolor=PREHEAT_COLOR, line=dict(width=0))
+        for s_adj, e_adj in preheats[["start", "end"]].itertuples(index=False, name=None)
+    ]
+    annotations = []
+    for s_adj, e_adj, prog_num in runs[["start", "end", "prog_num"]].itertuples(index=False, name=None):
+        shapes.append(dict(type="rect", x0=s_adj, x1=e_adj, y0=0, y1=1, xref=xref, yref=yref,
+                           fillcolor=RUN_COLOR, line=dict(width=0)))
+        if pd.notna(prog_num):
+            annotations.append(dict(x=s_adj + (e_adj - s_adj) / 2, xref=xref, yref=yref,
+                                    text=f"<b>{prog_num}</b>", **PROG_LABEL))
+    return shapes, annotations
+
+
+def build_shared_figure(view, names, webgl=None, max_points=DEFAULT_MAX_POINTS):
+    """
+    Alle Geräte in einer Figur: eine Zeile pro Gerät (Reihenfolge wie names), gemeinsame
+    X-Achse -> Zoom/Pan wirkt auf alle Öfen gleichzeitig. Geräte ohne Daten entfallen.
+    """
+    names = [name for name in names if not view.partition.for_device(name).empty]
+    curves = {}
+    for name in names:
+        subset = view.partition.for_device(name)
+        curves[name] = temperature_curves(subset["cycle_time"], subset, max_points)
+    # Ein WebGL-Kontext für die ganze Figur; Schwelle gilt für alle Kurven zusammen
+    scatter = scatter_class(sum(len(x) for device in curves.values() for x, _ in device.values()), webgl)
+    rows = max(len(names), 1)
+    height = rows * ROW_HEIGHT
+    fig = make_subplots(
+        rows=rows, cols=1, shared_xaxes=True, subplot_titles=names,
+        vertical_spacing=min(ROW_GAP / height, 1 / rows) if rows > 1 else 0,
+    )
+
+    shapes, annotations = [], []
+    for row, name in enumerate(names, start=1):
+        # Legende nur einmal (Farben sind in allen Zeilen gleich)
+        first = row == 1
+        if "Ist °C" in curves[name]:
+            x, y = curves[name]["Ist °C"]
+            fig.add_trace(scatter(
+                x=x, y=y, mode="lines", name="Ist °C",
+                legendgroup="ist", showlegend=first, line=IST_LINE
+            ), row=row, col=1)
+        if "Soll °C" in curves[name]:
+            x, y = curves[name]["Soll °C"]
+            fig.add_trace(scatter(
+                x=x, y=y, mode="lines", name="Soll °C",
+                legendgroup="soll", showlegend=first, line=SOLL_LINE
+            ), row=row, col=1)
+
+        axis = "" if row == 1 else str(row)
+        row_shapes, row_annotations = _device_decorations(
+            view.preheats.for_device(name), view.runs.for_device(name), f"x{axis}", f"y{axis} domain"
+        )
+        shapes += row_shapes
+        annotations += row_annotations
+
+    # Einmal gesammelt setzen statt add_shape pro Rechteck
+    fig.update_layout(
+        shapes=shapes,
+        annotations=list(fig.layout.annotations) + annotations,
+        height=height,
+        margin=dict(l=80, r=30, t=80, b=40),
+        template="plotly_white",
+        # Legende oberhalb des ersten Titels
+        legend=dict(orientation="h", y=1 + 30 / height, yanchor="bottom"),
+    )
+    # Gemeinsamer Zyklus-Bereich direkt als Achsenbereich
+    fig.update_xaxes(
+        type="date", tickformat="%H:%M", ticklabelmode="period", dtick=3600000 * 2, showticklabels=True,
+        **cycle_axis(view.start, view.end)
+    )
+    fig.update_yaxes(title_text="Temperatur °C", range=[Y_AXIS_MIN, Y_AXIS_MAX], dtick=50)
+    return fig
+
+
+# ---------------------------------------------------------------
+# Client-Rendering: ein JSON-Dokument mit allen Daten + kleines JS, das die Diagramme baut
+# ---------------------------------------------------------------
+CLIENT_TEMPLATE = """<div id="ofen-charts"></div>
+    <script type="application/json" id="ofen-data">{payload}</script>
+    <script type="text/javascript">{script}</script>"""
+CLIENT_HEADER, _, CLIENT_FOOTER = CLIENT_TEMPLATE.partition("{payload}")
+
+# Zeiten im JSON sind ms-Offsets zu data.base (Epoche in ms, naive Zeit als UTC wie in Plotly).
+# Diagramme werden erst gebaut, wenn ihr Platzhalter in die Nähe des Sichtbereichs kommt,
+# und weit außerhalb wieder freigegeben (Plotly.purge) -> Speicher unabhängig von der Ofenzahl.
+CLIENT_SCRIPT = """
+(function () {
+    var data = JSON.parse(document.getElementById("ofen-data").textContent);
+    var container = document.getElementById("ofen-charts");
+    var toDate = function (t) { return data.base + t; };
+
+    function draw(div, device) {
+        var traces = Object.keys(device.curves).map(function (name) {
+            var curve = device.curves[name];
+            return Object.assign({
+                type: device.gl ? "scattergl" : "scatter", mode: "lines", name: name,
+                x: curve.t.map(toDate), y: curve.y
+            }, data.traces[name]);
+        });
+
+        var shapes = [], annotations = [];
+        device.preheats.start.forEach(function (s, k) {
+            shapes.push(Object.assign({x0: toDate(s), x1: toDate(device.preheats.end[k])}, data.shapes.preheat));
+        });
+        device.runs.start.forEach(function (s, k) {
+            var e = device.runs.end[k], prog = device.runs.prog[k];
+            shapes.push(Object.assign({x0: toDate(s), x1: toDate(e)}, data.shapes.run));
+            if (prog !== null) {
+                annotations.push(Object.assign({x: toDate((s + e) / 2), text: "<b>" + prog + "</b>"}, data.annotation));
+            }
+        });
+
+        var layout = JSON.parse(JSON.stringify(data.layout));
+        layout.title = {text: device.name};
+        layout.xaxis.range = data.range.map(toDate);
+        layout.xaxis.autorangeoptions = {include: layout.xaxis.range};
+        layout.shapes = shapes;
+        layout.annotations = annotations;
+        Plotly.newPlot(div, traces, layout, {responsive: true});
+    }
+
+    var placeholders = data.devices.map(function (device, i) {
+        if (i > 0) {
+            var hr = document.createElement("hr");
+            hr.style.margin = "40px 0";
+            container.appendChild(hr);
+        }
+        // Platzhalter mit fester Höhe, damit die Seite beim Nachladen nicht springt
+        var div = document.createElement("div");
+        div.style.height = data.layout.height + "px";
+        div.dataset.device = i;
+        container.appendChild(div);
+        return div;
+    });
+
+    if (!("IntersectionObserver" in window)) {
+        placeholders.forEach(function (div, i) { draw(div, data.devices[i]); });
+        return;
+    }
+
+    var drawn = {};
+    var show = new IntersectionObserver(function (entries) {
+        entries.forEach(function (entry) {
+            var i = entry.target.dataset.device;
+            if (entry.isIntersecting && !drawn[i]) {
+                drawn[i] = true;
+                draw(entry.target, data.devices[i]);
+            }
+        });
+    }, {rootMargin: data.lazy.render_margin + "px 0px"});
+    var release = new IntersectionObserver(function (entries) {
+        entries.forEach(function (entry) {
+            var i = entry.target.dataset.device;
+            if (!entry.isIntersecting && drawn[i]) {
+                drawn[i] = false;
+                Plotly.purge(entry.target);
+            }
+        });
+    }, {rootMargin: data.lazy.purge_margin + "px 0px"});
+    placeholders.forEach(function (div) {
+        show.observe(div);
+        release.observe(div);
+    });
+})();
+"""
+
+# Abstand zum Sichtbereich in Pixel: ab hier zeichnen / ab hier wieder freigeben
+LAZY_RENDER_MARGIN = 700
+LAZY_PURGE_MARGIN = 3500
+
+
+def _ms_offsets(values, base):
+    """datetime64-Werte als ganze Millisekunden seit base (int64 ns)."""
+    ns = np.asarray(values, dtype="datetime64[ns]").view("int64")
+    return ((ns - base) // 1_000_000).tolist()
+
+
+def _json_values(values):
+    """Temperaturen auf 2 Nachkommastellen (float32-Rauschen weg), NaN -> null."""
+    values = np.round(np.asarray(values, dtype="float64"), 2)
+    return np.where(np.isnan(values), None, values).tolist()
+
+
+def payload_devices(view, names, webgl=None, max_points=DEFAULT_MAX_POINTS):
+    """Pro Gerät mit Daten ein Eintrag des JSON-Dokuments: Kurven, Intervalle, Programmnummern."""
+    base = pd.Timestamp(view.start).value
+    for name in names:
+        subset = view.partition.for_device(name)
+        if subset.empty:
+            continue
+        curves = temperature_curves(subset["cycle_time"], subset, max_points)
+        preheats = view.preheats.for_device(name)
+        runs = view.runs.for_device(name)
+        yield {
+            "name": name,
+            "gl": scatter_class(sum(len(x) for x, _ in curves.values()), webgl) is go.Scattergl,
+            "curves": {
+                column: {"t": _ms_offsets(x, base), "y": _json_values(y)}
+                for column, (x, y) in curves.items()
+            },
+            "preheats": {"start": _ms_offsets(preheats["start"], base), "end": _ms_offsets(preheats["end"], base)},
+            "runs": {
+                "start": _ms_offsets(runs["start"], base),
+                "end": _ms_offsets(runs["end"], base),
+                "prog": runs["prog_num"].astype(object).where(runs["prog_num"].notna(), None).tolist(),
+            },
+        }
+
+
+def payload_meta(view):
+    """
+    Gemeinsamer Teil des JSON-Dokuments (ohne devices): Zyklus, Layout, Linien- und
+    Rechteck-Stile nur einmal.
+    """
+    base = pd.Timestamp(view.start).value
+    rect = dict(type="rect", y0=0, y1=1, xref="x", yref="paper", line=dict(width=0))
+    return {
+        "base": base // 1_000_000,
+        "range": [0, (pd.Timestamp(view.end).value - base) // 1_000_000],
+        "layout": go.Figure().update_layout(**DEVICE_LAYOUT).layout.to_plotly_json(),
+        "traces": {"Ist °C": {"line": IST_LINE}, "Soll °C": {"line": SOLL_LINE}},
+        "shapes": {"preheat": dict(rect, fillcolor=PREHEAT_COLOR), "run": dict(rect, fillcolor=RUN_COLOR)},
+        "annotation": dict(PROG_LABEL, yref="paper"),
+        "lazy": {"render_margin": LAZY_RENDER_MARGIN, "purge_margin": LAZY_PURGE_MARGIN},
+    }
+
+
+def _to_json(value):
+    # "</" im JSON würde den <script>-Block beenden
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, allow_nan=False).replace("</", "<\\/")
+
+
+def iter_client_charts(view, names, webgl=None, max_points=DEFAULT_MAX_POINTS):
+    """
+    HTML-Teil für das Client-Rendering (plotly.js muss im <head> sein): JSON-Dokument
+    {...payload_meta, "devices": [...]} Gerät für Gerät, danach das Bootstrap-Skript.
+    """
+    yield CLIENT_HEADER + _to_json(payload_meta(view))[:-1] + ',"devices":['
+    for i, device in enumerate(payload_devices(view, names, webgl, max_points)):
+        yield ("," if i else "") + _to_json(device)
+    yield "]}" + CLIENT_FOOTER.format(script=CLIENT_SCRIPT)
+
+
+def iter_dashboard(view, names, title="Ofen-Dashboard", shared_axes=False, webgl=None,
+                   max_points=DEFAULT_MAX_POINTS, offline=False, client=False, jobs=1):
+    """
+    Dashboard-HTML für einen Zyklus als Folge von Text-Stücken (Kopf, jedes Diagramm sobald
+    es fertig ist, Fuß), damit nie das ganze Dokument im Speicher liegen muss.
+    shared_axes=True: eine gemeinsame Figur mit verknüpfter X-Achse (einmal serialisiert)
+    statt einer Figur pro Gerät.
+    client=True: Einzeldiagramme werden erst im Browser aus einem JSON-Dokument gebaut,
+    jeweils erst beim Scrollen in die Nähe (Platzhalter + IntersectionObserver).
+    webgl: siehe scatter_class (None = automatisch nach Punktzahl).
+    max_points: Punkte pro Temperaturkurve (None/0 = alle Rohdaten zeichnen).
+    offline=True: plotly.js genau einmal im <head> eingebettet, funktioniert ohne Internet.
+    jobs: Worker-Prozesse für die Einzeldiagramme (nur ohne shared_axes/client).
+    """
+    if shared_axes and client:
+        raise ValueError("shared_axes und client schließen sich aus")
+
+    if offline:
+        head = OFFLINE_HEAD.format(plotlyjs=get_plotlyjs())
+    elif client:
+        head = CDN_HEAD.format(version=get_plotlyjs_version())
+    else:
+        head = ""
+    yield PAGE_HEADER.format(title=html.escape(title), head=head)
+
+    include_plotlyjs = False if offline else 'cdn'
+    if client:
+        yield from iter_client_charts(view, names, webgl, max_points)
+    elif shared_axes:
+        fig = build_shared_figure(view, names, webgl, max_points)
+        yield fig.to_html(full_html=False, include_plotlyjs=include_plotlyjs)
+    else:
+        for i, part in enumerate(iter_chart_parts(view, names, webgl, max_points, include_plotlyjs, jobs)):
+            yield (CHART_SEPARATOR if i else "") + part
+
+    yield PAGE_FOOTER
+
+
+def render_dashboard(view, names, title="Ofen-Dashboard", **options):
+    """Vollständiges Dashboard-HTML als ein String (Optionen siehe iter_dashboard)."""
+    return "".join(iter_dashboard(view, names, title, **options))
+
+
+# ---------------------------------------------------------------
+# Übersichtsseite für den Stapelbetrieb (eine Zeile pro CSV)
+# ---------------------------------------------------------------
+INDEX_TEMPLATE = """
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>{title}</title>
+    <style>
+        table {{ border-collapse: collapse; }}
+        th, td {{ border: 1px solid #ccc; padding: 4px 10px; text-align: left; vertical-align: top; }}
+        td.num {{ text-align: right; }}
+        tr.error {{ background: #fdd; }}
+    </style>
+</head>
+<body style="font-family:Arial; margin:20px;">
+    <h1>{title}</h1>
+    <p>{summary}</p>
+    <table>
+        <tr><th>Datei</th><th>Größe</th><th>Dauer</th><th>Dashboards / Fehler</th></tr>
+{rows}
+    </table>
+</body>
+</html>
+"""
+
+
+def render_index(results, index_dir, title="Ofen-Dashboards"):
+    """
+    Übersicht als HTML: pro Ergebnis (dict mit file, size, seconds, outputs, error) eine Zeile
+    mit Laufzeit und Links (relativ zu index_dir) bzw. der Fehlermeldung.
+    """
+    rows = []
+    for r in results:
+        if r["error"] is None:
+            links = [f'<a href="{html.escape(os.path.relpath(p, index_dir))}">{html.escape(os.path.basename(p))}</a>'
+                     for p in r["outputs"]]
+            cell = "<br>".join(links) or "–"
+        else:
+            cell = html.escape(r["error"])
+        rows.append(
+            f'        <tr class="{"ok" if r["error"] is None else "error"}"><td>{html.escape(r["file"])}</td>'
+            f'<td class="num">{r["size"] / 1e6:.1f} MB</td><td class="num">{r["seconds"]:.1f} s</td><td>{cell}</td></tr>'
+        )
+    failed = sum(r["error"] is not None for r in results)
+    total = sum(r["seconds"] for r in results)
+    summary = f"{len(results)} Dateien, {len(results) - failed} erfolgreich, {failed} fehlgeschlagen – Rechenzeit gesamt {total:.1f} s"
+    return INDEX_TEMPLATE.format(title=html.escape(title), summary=summary, rows="\n".join(rows))
+
+
+def _import_brotli():
+    # brotli ist optional (nicht in den Abhängigkeiten)
+    try:
+        import brotli
+    except ImportError:
+        raise RuntimeError("❌ Für .br-Ausgabe wird das Paket 'brotli' benötigt (pip install brotli).") from None
+    return brotli
+
+
+def _compressed_writer(method, f):
+    """(write, finish) für eine komprimierte Ausgabe in die geöffnete Datei f."""
+    if method == "gzip":
+        gz = gzip.GzipFile(filename="", mode="wb", fileobj=f, compresslevel=9, mtime=0)
+        return gz.write, gz.close
+    compressor = _import_brotli().Compressor()
+    return (lambda data: f.write(compressor.process(data))), (lambda: f.write(compressor.finish()))
+
+
+def write_dashboard(path, html_content, compress=()):
+    """
+    Schreibt das Dashboard nach path und zusätzlich je eine komprimierte Variante pro
+    Verfahren in compress ("gzip" -> path.gz, "br" -> path.br). Gibt alle Pfade zurück.
+    html_content: String oder Folge von Stücken (iter_dashboard) – Stücke werden direkt in
+    alle Dateien geschrieben, das Dokument liegt nie vollständig im Speicher. Bestehende Dateien
+    werden erst am Ende ersetzt (atomar per Umbenennen).
+    """
+    # --compress ist wiederholbar: jedes Verfahren nur einmal (sonst teilen sich zwei Writer eine .tmp-Datei)
+    compress = list(dict.fromkeys(compress))
+    if "br" in compress:
+        _import_brotli()
+    if isinstance(html_content, str):
+        html_content = [html_content]
+
+    paths = [path] + [path + COMPRESSIONS[method] for method in compress]
+    tmp_paths = [p + ".tmp" for p in paths]
+    try:
+        with ExitStack() as stack:
+            files = [stack.enter_context(open(p, "wb")) for p in tmp_paths]
+            writers = [(files[0].write, None)]
+            writers += [_compressed_writer(method, f) for method, f in zip(compress, files[1:])]
+            for chunk in html_content:
+                data = chunk.encode("utf-8")
+                for write, _ in writers:
+                    write(data)
+            for _, finish in writers[1:]:
+                finish()
+    except BaseException:
+        for p in tmp_paths:
+            if os.path.exists(p):
+                os.remove(p)
+        raise
+
+    # Erst vollständig schreiben, dann umbenennen: wer die Datei gerade öffnet, sieht nie eine halbe Seite
+    for tmp, p in zip(tmp_paths, paths):
+        os.replace(tmp, p)
+    return paths
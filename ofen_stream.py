@@ -0,0 +1,112 @@
+# ofen_stream.py
+# Große Exporte Stück für Stück einlesen (Speicherbedarf nach Stückgröße statt Dateigröße)
+# ---------------------------------------------------------------
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from ofen_cycle import CYCLE_START_HOUR, NS_PER_DAY, NS_PER_HOUR
+from ofen_downsample import DEFAULT_MAX_POINTS, fixed_bucket_indices, step_indices
+from ofen_loader import (
+    CSV_ERROR,
+    MIN_COLUMNS,
+    CsvDialect,
+    DeviceRegistry,
+    clean_frame,
+    column_map,
+    concat_frames,
+    iter_csv_sniffed,
+)
+from ofen_phases import DevicePartition, IntervalStore, extract_phases, phase_state
+
+# Zeilen pro Stück: einige zehn MB Rohtext, unabhängig von der Dateigröße
+STREAM_CHUNK_ROWS = 200_000
+
+
+@dataclass
+class StreamReport:
+    dialect: CsvDialect
+    chunks: int = 0
+    rows_read: int = 0
+    rows_kept: int = 0
+    unordered: bool = False  # Zeitstempel springen zwischen zwei Stücken zurück
+
+
+def thin_chunk(df, max_points=DEFAULT_MAX_POINTS):
+    """
+    Nur die Zeilen, die ein Diagramm mit max_points Punkten pro 24h-Zyklus noch braucht: pro Gerät
+    die Min/Max-Hüllkurve von Ist °C in festen Buckets (Zyklus / (max_points/4), am Zyklusbeginn
+    ausgerichtet) und die Stufenkanten von Soll °C, solange es nicht mehr als die Hüllkurve sind.
+    Die spätere Ausdünnung beim Zeichnen liefert daraus dieselbe Kurve. max_points=None/0: nichts verwerfen.
+    """
+    if not max_points or df.empty:
+        return df
+    width = NS_PER_DAY // max(max_points // 4, 1)
+    origin = CYCLE_START_HOUR * NS_PER_HOUR
+    partition = DevicePartition(df)
+    keep = []
+    for name in df["row_name"].cat.categories:
+        subset = partition.for_device(name)
+        if subset.empty:
+            continue
+        ts = subset["timestamp"].to_numpy(dtype="datetime64[ns]").view("int64")
+        soll = step_indices(subset["Soll °C"])
+        # Mehr Stufenkanten, als die Hüllkurve in den vom Stück berührten Buckets hätte (4 pro Bucket):
+        # dann Hüllkurve – so bleibt der Speicher durch die Zahl der Buckets begrenzt, nicht der Stücke
+        buckets = (ts[-1] - origin) // width - (ts[0] - origin) // width + 1
+        if len(soll) > 4 * buckets:
+            soll = fixed_bucket_indices(ts, subset["Soll °C"], width, origin)
+        idx = np.union1d(fixed_bucket_indices(ts, subset["Ist °C"], width, origin), soll)
+        keep.append(subset.index[idx])
+    # Über die Index-Labels auswählen: die Zeitreihenfolge von df bleibt erhalten
+    return df[df.index.isin(np.concatenate(keep))]
+
+
+def stream_tables(path, chunksize=STREAM_CHUNK_ROWS, max_points=DEFAULT_MAX_POINTS):
+    """
+    Wie das vollständige Einlesen (Abschnitte 1-4), aber Stück für Stück: Phasen laufen mit dem
+    Zustand über Stückgrenzen weiter, von den Messwerten bleibt pro Stück nur die für
+    max_points nötige Hüllkurve (thin_chunk). Gibt ((df, preheats, runs, registry), StreamReport) zurück.
+    """
+    chunks, dialect = iter_csv_sniffed(path, chunksize)
+    report = StreamReport(dialect)
+    mapping = None
+    state = None
+    last_timestamp = None
+    frames, preheats, runs, devices = [], [], [], []
+
+    for raw in chunks:
+        if mapping is None:
+            if raw.shape[1] < MIN_COLUMNS:
+                raise ValueError(CSV_ERROR)
+            mapping = column_map(raw.columns)
+        report.chunks += 1
+        report.rows_read += len(raw)
+
+        df, registry = clean_frame(raw, mapping)
+        del raw
+        if df.empty:
+            continue
+        if last_timestamp is not None and df["timestamp"].iloc[0] < last_timestamp:
+            report.unordered = True
+        last_timestamp = df["timestamp"].iloc[-1]
+
+        # Offene Vorheiz-/Laufphasen des vorherigen Stücks fortsetzen
+        chunk_preheats, chunk_runs = extract_phases(df, state)
+        state = phase_state(df, state)
+        preheats.append(chunk_preheats.table)
+        runs.append(chunk_runs.table)
+        devices.append(registry.table)
+        frames.append(thin_chunk(df, max_points))
+
+    if not frames:
+        raise ValueError("❌ Nach der Zeitbereinigung sind keine gültigen Daten mehr vorhanden. Prüfe das Zeitformat.")
+
+    df = concat_frames(frames)
+    if report.unordered:
+        df = df.iloc[np.argsort(df["timestamp"].to_numpy(), kind="stable")].reset_index(drop=True)
+    report.rows_kept = len(df)
+    registry = DeviceRegistry(pd.concat(devices, ignore_index=True).drop_duplicates("row_name"))
+    return (df, IntervalStore(concat_frames(preheats)), IntervalStore(concat_frames(runs)), registry), report
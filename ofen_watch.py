@@ -0,0 +1,105 @@
+# ofen_watch.py
+# Ordner beobachten: neue/geänderte MIWE-Exporte automatisch verarbeiten
+# ---------------------------------------------------------------
+
+import fnmatch
+import os
+import threading
+import time
+import traceback
+
+# Erst verarbeiten, wenn so lange nichts mehr geschrieben wurde (Gateway schreibt in Schüben)
+DEBOUNCE_SECONDS = 2.0
+# Schreibt das Gateway ununterbrochen weiter: spätestens nach so vielen Sekunden trotzdem verarbeiten
+MAX_WAIT_SECONDS = 60.0
+# Ohne watchdog (inotify & Co.): so oft nachsehen
+POLL_SECONDS = 5.0
+
+
+def _snapshot(directory, pattern):
+    """{Pfad: (mtime_ns, Größe)} aller passenden Dateien im Ordner."""
+    snapshot = {}
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_file() and fnmatch.fnmatch(entry.name, pattern):
+                st = entry.stat()
+                snapshot[entry.path] = (st.st_mtime_ns, st.st_size)
+    return snapshot
+
+
+def _start_observer(directory, wake):
+    """
+    Dateisystem-Ereignisse über watchdog (optional, kommt mit streamlit): jedes Ereignis weckt
+    die Schleife. Ohne watchdog None -> Polling.
+    """
+    try:
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+    except ImportError:
+        return None
+
+    class _Wake(FileSystemEventHandler):
+        def on_any_event(self, event):
+            wake.set()
+
+    observer = Observer()
+    observer.schedule(_Wake(), directory, recursive=False)
+    observer.start()
+    return observer
+
+
+def _settled(directory, pattern, debounce, max_wait):
+    """
+    Wartet, bis sich debounce Sekunden lang keine passende Datei mehr ändert, höchstens aber
+    max_wait Sekunden; gibt den Stand zurück.
+    """
+    deadline = time.monotonic() + max_wait
+    current = _snapshot(directory, pattern)
+    while True:
+        # Fest schlafen statt auf Ereignisse: ein Schreibvorgang löst mehrere Ereignisse aus
+        time.sleep(debounce)
+        latest = _snapshot(directory, pattern)
+        if latest == current or time.monotonic() >= deadline:
+            return latest
+        current = latest
+
+
+def watch_folder(directory, on_change, pattern="*.csv", debounce=DEBOUNCE_SECONDS, poll=POLL_SECONDS,
+                 max_wait=MAX_WAIT_SECONDS):
+    """
+    Ruft on_change(pfad) für den neuesten neuen/geänderten Export auf – beim Start einmal für den
+    neuesten vorhandenen, danach nach jedem abgeschlossenen Schreibschub (bei Dauerschreiben
+    spätestens alle max_wait Sekunden). Schläft dazwischen
+    (watchdog: bis zum nächsten Ereignis, sonst poll Sekunden). Fehler einer Verarbeitung werden
+    ausgegeben, die Beobachtung läuft weiter. Endet mit Strg+C.
+    """
+    wake = threading.Event()
+    observer = _start_observer(directory, wake)
+    how = "Dateisystem-Ereignisse" if observer is not None else f"Polling alle {poll:g} s"
+    print(f"👀 Beobachte {os.path.abspath(directory)} ({pattern}, {how}) – Strg+C beendet")
+
+    seen = {}
+    try:
+        while True:
+            # Vor dem Nachsehen zurücksetzen: Änderungen während on_change wecken sofort wieder
+            wake.clear()
+            if _snapshot(directory, pattern) != seen:
+                current = _settled(directory, pattern, debounce, max_wait)
+                changed = [p for p, sig in current.items() if seen.get(p) != sig]
+                seen = current
+                if changed:
+                    # Ältere Exporte würden sofort wieder überschrieben: nur der neueste zählt
+                    newest = max(changed, key=lambda p: current[p][0])
+                    print(f"🔄 Neue Daten: {newest}")
+                    try:
+                        on_change(newest)
+                    except Exception:
+                        traceback.print_exc()
+                        print(f"❌ Verarbeitung von {newest} fehlgeschlagen – warte auf die nächste Änderung")
+            wake.wait(None if observer is not None else poll)
+    except KeyboardInterrupt:
+        print("👋 Beobachtung beendet")
+    finally:
+        if observer is not None:
+            observer.stop()
+            observer.join()
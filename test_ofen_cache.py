@@ -0,0 +1,134 @@
+# test_ofen_cache.py
+# Differenztest: Anhänge-Modus von load_tables gegen vollständiges Einlesen derselben Bytes
+# Ausführen: python -m unittest test_ofen_cache  (oder pytest)
+# ---------------------------------------------------------------
+
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from ofen_cache import (
+    STATE_TABLE,
+    complete_length,
+    complete_row,
+    load_tables,
+    parquet_available,
+    sidecar_dir,
+)
+from ofen_loader import clean_frame, read_csv_sniffed
+from ofen_phases import extract_phases
+
+HEADER = "Datum/Zeit;Gerät;Meldung;Soll °C;Ist °C"
+# Gerät -> Uhrversatz in ms: der Stikkenofen geht nach, seine Zeilen landen zeitlich vor
+# bereits gecachten Zeilen anderer Geräte (append_tables muss neu sortieren)
+DEVICES = {
+    "MIWE ideal TC (1/2)": 0,
+    "MIWE ideal TC (1/3)": 0,
+    "MIWE roll-in (4)": 0,
+    "MIWE stikken (5/1)": -6500,
+}
+MESSAGES = [
+    "Herd 1: Arbeitsprog. P12 geladen", "Herd 1: Programm gestartet", "Herd 1: Programmende",
+    "Herd 2: Arbeitsprog. P7 geladen", "Herd 2: Programm gestartet", "Herd 2: Programm beendet",
+    "Arbeitsprog. P103 geladen", "Programm gestartet", "Programm gestoppt",
+    "Temperatur", "Dampf", "Status OK",
+]
+
+
+def parse(source, state=None):
+    """Wie main.load_and_clean_csv, ohne Ausgaben."""
+    df, _ = read_csv_sniffed(source)
+    df, registry = clean_frame(df)
+    preheats, runs = extract_phases(df, state)
+    return df, preheats, runs, registry
+
+
+def random_export(rng, n):
+    """MIWE-Export (cp1252, Semikolon, Dezimalkomma) in Schreibreihenfolge, ohne gleiche Zeitstempel."""
+    # Ganze Sekunden, der versetzte Ofen liegt auf halben: keine Zeitstempel doppelt
+    clock = pd.Timestamp("2025-10-21 20:00") + pd.to_timedelta(np.cumsum(rng.integers(1, 5, n)), unit="s")
+    devices = rng.choice(list(DEVICES), n)
+    lines = [HEADER]
+    for t, device in zip(clock, devices):
+        t += pd.Timedelta(milliseconds=DEVICES[device])
+        soll, ist = rng.choice([180, 220.5, 250]), rng.uniform(150, 260)
+        lines.append(f"{t.strftime('%y/%m/%d,%H:%M:%S,%f')[:-3]};{device};{rng.choice(MESSAGES)};"
+                     f"{soll};{ist:.1f}".replace(".", ","))
+    return "\n".join(lines).encode("cp1252")
+
+
+def expected_source(source):
+    """Was load_tables von diesen Bytes lesen soll: eine letzte Zeile nur, wenn sie alle Felder hat."""
+    end = complete_length(source)
+    if end < len(source) and not complete_row(source, end):
+        return source[:end]
+    return source
+
+
+def _rows(table):
+    """Tabelle als Liste von Tupeln (fehlende Werte -> None)."""
+    return [tuple(None if pd.isna(v) else v for v in row)
+            for row in table.astype(object).itertuples(index=False, name=None)]
+
+
+def _intervals(store):
+    """Intervalle unabhängig von der Reihenfolge der Geräte im Store."""
+    return sorted(_rows(store.table), key=lambda row: (row[0], row[1]))
+
+
+@unittest.skipUnless(parquet_available(), "pyarrow fehlt – ohne Parquet-Cache gibt es keinen Anhänge-Modus")
+class IncrementalLoadTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, "Ofenauswertung.csv")
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def load(self, source, incremental=True):
+        with open(self.path, "wb") as f:
+            f.write(source)
+        with contextlib.redirect_stdout(io.StringIO()):
+            return load_tables(self.path, parse, incremental)[0]
+
+    def assert_same(self, tables, source):
+        expected = parse(expected_source(source))
+        self.assertTrue(tables[0]["timestamp"].is_monotonic_increasing)
+        self.assertEqual(_rows(tables[0].reset_index(drop=True)), _rows(expected[0].reset_index(drop=True)))
+        self.assertEqual(_intervals(tables[1]), _intervals(expected[1]))
+        self.assertEqual(_intervals(tables[2]), _intervals(expected[2]))
+
+    def test_growing_export(self):
+        # Datei wächst stückweise: Schnitte mitten in Zeilen (unvollständige letzte Zeile) und
+        # direkt vor einem Zeilenumbruch (fertige letzte Zeile ohne Zeilenumbruch)
+        rng = np.random.default_rng(22)
+        for _ in range(5):
+            source = random_export(rng, 300)
+            line_ends = [i for i in range(len(source)) if source[i:i + 1] == b"\n"]
+            cuts = np.concatenate([rng.integers(line_ends[5], len(source), 6), rng.choice(line_ends[5:], 3)])
+            shutil.rmtree(sidecar_dir(self.path), ignore_errors=True)
+            for cut in [*np.sort(cuts), len(source), len(source)]:
+                self.assert_same(self.load(source[:cut]), source[:cut])
+            # Vollständiger Lauf auf denselben Cache
+            self.assert_same(self.load(source, incremental=False), source)
+
+    def test_unreadable_state(self):
+        # Fehlt der gespeicherte Phasen-Zustand, wird vollständig eingelesen statt abzubrechen
+        source = random_export(np.random.default_rng(5), 200)
+        half = source.index(b"\n", len(source) // 2)
+        for cut in (half - 3, len(source)):
+            self.load(source[:cut])
+            for entry in os.listdir(sidecar_dir(self.path)):
+                os.remove(os.path.join(sidecar_dir(self.path), entry, f"{STATE_TABLE}.parquet"))
+            self.assert_same(self.load(source[:cut]), source[:cut])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+# test_ofen_phases.py
+# Differenztest: extract_phases / phase_state gegen die frühere Zustandsmaschine (groupby + iterrows)
+# Ausführen: python -m unittest test_ofen_phases  (oder pytest)
+# ---------------------------------------------------------------
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from ofen_phases import extract_phases, phase_state
+
+DEVICES = ["Ofen 1 Herd 1", "Ofen 1 Herd 2", "Ofen 2", "Stikkenofen 3"]
+PROGRAMS = ["12", "7", "103"]
+
+
+def legacy_phases(df):
+    """
+    Die ursprüngliche Schleife aus main.py (Stand vor user-006). Geändert gegenüber dem Original:
+    groupby mit observed=True (row_name ist inzwischen Categorical), pd.notna(prog_num) statt
+    Wahrheitswert (fehlende Nummer ist NaN statt None/""), Rückgabe statt globaler Listen.
+    """
+    preheats = []
+    runs = []  # jetzt: (name, start, end, prog_num)
+    for name, g in df.groupby("row_name", observed=True):
+        g = g.sort_values("timestamp")
+        t_load = t_start = prog_num = None
+        for _, r in g.iterrows():
+            t = r["timestamp"]
+            # Programmnummer merken, wenn vorhanden
+            if pd.notna(r["prog_num"]):
+                prog_num = r["prog_num"]
+
+            if r["is_loaded"]:
+                t_load = t
+            if r["is_started"]:
+                if t_load:
+                    preheats.append((name, t_load, t))
+                    t_load = None
+                t_start = t
+            if r["is_ended"] and t_start:
+                runs.append((name, t_start, t, prog_num))
+                t_start = None
+                prog_num = None  # Reset für nächsten Run
+    return preheats, runs
+
+
+def random_frame(rng, n):
+    """Zeitlich sortierte Meldungszeilen mit sich überlagernden Laden/Start/Ende-Flags."""
+    # Streng steigend: die alte Schleife sortierte pro Gerät instabil, bei gleichen Zeitstempeln
+    # wäre ihre Reihenfolge (und damit die Referenz) zufällig
+    ts = pd.Timestamp("2025-10-21 20:00") + pd.to_timedelta(np.cumsum(rng.integers(1, 6, n)), unit="s")
+    prog = rng.choice(PROGRAMS + [None] * 6, n)
+    return pd.DataFrame({
+        "timestamp": ts,
+        "row_name": pd.Categorical(rng.choice(DEVICES, n), categories=DEVICES),
+        "is_loaded": rng.random(n) < 0.2,
+        "is_started": rng.random(n) < 0.2,
+        "is_ended": rng.random(n) < 0.2,
+        "prog_num": pd.Categorical(prog, categories=PROGRAMS),
+    })
+
+
+def _rows(table):
+    """Intervalltabelle als Liste von Tupeln (fehlende Programmnummer -> None)."""
+    return [tuple(None if pd.isna(v) else v for v in row) for row in table.itertuples(index=False, name=None)]
+
+
+def _device_order(rows):
+    """Wie IntervalStore: stabil nach Gerät, innerhalb des Geräts in Zeitreihenfolge."""
+    return sorted(rows, key=lambda row: DEVICES.index(row[0]))
+
+
+class ExtractPhasesTest(unittest.TestCase):
+
+    def assert_same(self, preheats, runs, df):
+        expected_preheats, expected_runs = legacy_phases(df)
+        self.assertEqual(_device_order(preheats), _device_order(expected_preheats))
+        self.assertEqual(_device_order(runs), _device_order(_rows(pd.DataFrame(expected_runs))))
+
+    def test_matches_legacy_loop(self):
+        rng = np.random.default_rng(6)
+        for _ in range(200):
+            df = random_frame(rng, int(rng.integers(0, 120)))
+            preheats, runs = extract_phases(df)
+            self.assert_same(_rows(preheats.table), _rows(runs.table), df)
+
+    def test_resume_from_phase_state(self):
+        # Anhänge-Modus / Stückweises Lesen: an beliebigen Stellen teilen, mit dem Zustand weiterlesen
+        rng = np.random.default_rng(22)
+        for _ in range(200):
+            df = random_frame(rng, int(rng.integers(1, 120)))
+            cuts = np.sort(rng.integers(0, len(df) + 1, int(rng.integers(1, 4))))
+            preheats, runs = [], []
+            state = None
+            for lo, hi in zip([0, *cuts], [*cuts, len(df)]):
+                part = df.iloc[lo:hi]
+                part_preheats, part_runs = extract_phases(part, state)
+                state = phase_state(part, state)
+                preheats += _rows(part_preheats.table)
+                runs += _rows(part_runs.table)
+            self.assert_same(preheats, runs, df)
+
+
+if __name__ == "__main__":
+    unittest.main()